@@ -0,0 +1,97 @@
+"""Code generation and compile time of pyfurc problems versus NDIM.
+
+The problem is a chain of ``NDIM`` rigid links connected by rotational
+springs, loaded axially at its tip and held by a transverse spring at the
+tip. Every equilibrium equation depends on all DOFs through the tip
+displacement, so the size of the generated code grows quadratically with
+NDIM without common subexpression elimination (``--cse``) and linearly
+with it. Compile time should grow linearly with the size of the source,
+i.e. the last column should stay roughly constant.
+
+Usage::
+
+    python benchmarks/codegen_scaling.py 50 100 200 400 --cse
+
+``--processes`` differentiates and prints in a process pool.
+"""
+import argparse
+import os
+import tempfile
+
+import sympy as sp
+
+import pyfurc as pf
+from pyfurc.profiling import SolveProfile
+from pyfurc.tools import build_auto_executable, setup_auto_exec_env
+
+PHASES = ("differentiate", "print", "write", "compile", "link")
+
+
+def chain_problem(ndim, **kwargs):
+    phis = [pf.Dof(f"phi_{i:d}") for i in range(ndim)]
+    P = pf.Load("P")
+    k = pf.Parameter("k", 0.1)
+    bending = sum(
+        sp.Rational(1, 2) * (phi_b - phi_a) ** 2 for phi_a, phi_b in zip(phis, phis[1:])
+    )
+    bending += sp.Rational(1, 2) * phis[0] ** 2
+    x_tip = sum(sp.cos(phi) for phi in phis)
+    y_tip = sum(sp.sin(phi) for phi in phis)
+    energy = pf.Energy(
+        bending + sp.Rational(1, 2) * k * y_tip ** 2 - P * (ndim - x_tip)
+    )
+    return pf.BifurcationProblem(energy, name=f"chain{ndim:d}", **kwargs)
+
+
+def measure(ndim, base_dir, **kwargs):
+    problem = chain_problem(ndim, **kwargs)
+    solver = pf.BifurcationProblemSolver(problem, work_dir=base_dir)
+    profile = SolveProfile()
+    dirc = solver._prepare_solution_dir(profile)
+    build_auto_executable(
+        dirc,
+        problem.problem_name,
+        setup_auto_exec_env(),
+        compile_flags=solver.compile_flags,
+        link_flags=solver.link_flags,
+        silent=True,
+        profile=profile,
+    )
+    if not os.path.isfile(os.path.join(dirc, f"{problem.problem_name}.out")):
+        raise RuntimeError(f"Building the problem with NDIM={ndim:d} failed.")
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ndims", type=int, nargs="+")
+    parser.add_argument("--cse", action="store_true")
+    parser.add_argument("--analytic-jacobian", action="store_true")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{'NDIM':>6s}"
+        + "".join(f"{name:>14s}" for name in PHASES)
+        + f"{'source':>12s}"
+        + f"{'compile/kB':>12s}"
+    )
+    with tempfile.TemporaryDirectory() as base_dir:
+        for ndim in args.ndims:
+            profile = measure(
+                ndim,
+                base_dir,
+                cse=args.cse,
+                analytic_jacobian=args.analytic_jacobian,
+                processes=args.processes,
+            )
+            print(
+                f"{ndim:>6d}"
+                + "".join(f"{profile.wall_time(name):>14.3f}" for name in PHASES)
+                + f"{profile.sizes['source']:>12d}"
+                + f"{profile.wall_time('compile') / profile.sizes['source'] * 1e3:>12.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
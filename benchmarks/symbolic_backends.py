@@ -0,0 +1,60 @@
+"""Differentiation time of the sympy and SymEngine backends versus NDIM.
+
+Uses the chain of ``benchmarks/codegen_scaling.py``, whose energy has
+O(NDIM) terms and whose Hessian has NDIM**2 non-zero entries. For every
+backend the time to compute the equilibrium equations, the Hessian and
+the parameter derivatives is printed, including the conversion of the
+SymEngine results back to sympy. The generated code is identical for both
+backends.
+
+Usage::
+
+    python benchmarks/symbolic_backends.py 25 50 100
+"""
+import argparse
+import os
+import sys
+import time
+
+import pyfurc as pf
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from codegen_scaling import chain_problem  # noqa: E402
+
+METHODS = ("equilibrium", "hessian", "parameter_derivatives")
+
+
+def measure(ndim, backend):
+    energy = pf.Energy(chain_problem(ndim).energy.expr, backend=backend)
+    times = []
+    for method in METHODS:
+        start = time.perf_counter()
+        getattr(energy, method)()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ndims", type=int, nargs="+")
+    args = parser.parse_args()
+
+    print(
+        f"{'NDIM':>6s}{'backend':>11s}"
+        + "".join(f"{name:>23s}" for name in METHODS)
+        + f"{'speedup':>9s}"
+    )
+    for ndim in args.ndims:
+        reference = None
+        for backend in pf.Energy.symbolic_backends:
+            times = measure(ndim, backend)
+            reference = reference or sum(times)
+            print(
+                f"{ndim:>6d}{backend:>11s}"
+                + "".join(f"{wall:>23.3f}" for wall in times)
+                + f"{reference / sum(times):>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
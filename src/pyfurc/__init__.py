@@ -1,25 +1,50 @@
+"""pyfurc: AUTO-07p made accessible through python.
+
+The public classes and functions are loaded lazily on first attribute
+access, so ``import pyfurc`` does not import sympy, numpy or pandas.
+"""
 __author__ = "ak"
 __version__ = "0.2.3"
-import configparser
-import os
-import warnings
+import importlib
+
+_lazy_attributes = {
+    "ExecutableCache": "pyfurc.cache",
+    "BifurcationProblem": "pyfurc.core",
+    "BifurcationProblemSolution": "pyfurc.core",
+    "BifurcationProblemSolver": "pyfurc.core",
+    "Dof": "pyfurc.core",
+    "Energy": "pyfurc.core",
+    "Load": "pyfurc.core",
+    "Parameter": "pyfurc.core",
+    "PhysicalQuantity": "pyfurc.core",
+    "AutoCodePrinter": "pyfurc.printing",
+    "PhaseRecord": "pyfurc.profiling",
+    "SolveProfile": "pyfurc.profiling",
+    "SolutionStore": "pyfurc.storage",
+    "BifurcationSweep": "pyfurc.sweep",
+    "SweepResult": "pyfurc.sweep",
+    "setup_auto_exec_env": "pyfurc.tools",
+    "AutoOutputReader": "pyfurc.util",
+    "AutoParameters": "pyfurc.util",
+    "AutoTable": "pyfurc.util",
+    "ContinuationPoint": "pyfurc.util",
+    "DataDir": "pyfurc.util",
+    "Fort7Parser": "pyfurc.util",
+    "Fort8Reader": "pyfurc.util",
+    "HiddenAutoParameters": "pyfurc.util",
+    "ParamDict": "pyfurc.util",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-from pyfurc.core import (
-    BifurcationProblem,
-    BifurcationProblemSolution,
-    BifurcationProblemSolver,
-    Dof,
-    Energy,
-    Load,
-    Parameter,
-    PhysicalQuantity,
-)
-from pyfurc.tools import setup_auto_exec_env
-from pyfurc.util import (
-    AutoCodePrinter,
-    AutoOutputReader,
-    AutoParameters,
-    DataDir,
-    HiddenAutoParameters,
-    ParamDict,
-)
+def __dir__():
+    return sorted(list(globals()) + __all__)
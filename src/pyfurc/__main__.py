@@ -0,0 +1,5 @@
+import sys
+
+from pyfurc.cli import main
+
+sys.exit(main())
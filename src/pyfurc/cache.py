@@ -0,0 +1,201 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from subprocess import PIPE, Popen
+
+
+def default_cache_dir():
+    """Returns the default location of the executable cache, i.e.
+    ``$XDG_CACHE_HOME/pyfurc/executables`` or
+    ``~/.cache/pyfurc/executables``."""
+    base_dir = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(base_dir, "pyfurc", "executables")
+
+
+_file_digests = {}
+_compiler_versions = {}
+
+
+def _file_digest(fname):
+    """sha256 of a file, memoized on path, size and modification time."""
+    try:
+        stat = os.stat(fname)
+    except FileNotFoundError:
+        return "missing"
+    memo_key = (fname, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(fname, "rb") as infile:
+            for block in iter(lambda: infile.read(1 << 20), b""):
+                digest.update(block)
+        _file_digests[memo_key] = digest.hexdigest()
+    return _file_digests[memo_key]
+
+
+def _compiler_version(compiler="gfortran"):
+    if compiler not in _compiler_versions:
+        try:
+            out, _ = Popen(
+                [compiler, "--version"], stdout=PIPE, stderr=PIPE
+            ).communicate()
+            version = out.decode(errors="replace").splitlines()[0] if out else ""
+        except FileNotFoundError:
+            version = "missing"
+        _compiler_versions[compiler] = version
+    return _compiler_versions[compiler]
+
+
+class ExecutableCache:
+    """Persistent, content-addressed cache of compiled AUTO-07p executables.
+
+    Entries are keyed on a hash of the generated FORTRAN source, the
+    compiler flags, the compiler version and the ``libauto`` build the
+    executable is linked against. When the total size of the cache
+    exceeds ``max_size``, the least recently used entries are evicted.
+    All modifications of the cache directory are guarded by a file lock,
+    so several processes can share one cache.
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Directory holding the cached executables. Defaults to
+        :func:`pyfurc.cache.default_cache_dir`.
+    max_size : int, optional
+        Maximum total size of the cache in bytes, by default 512 MiB.
+
+    Variables
+    ---------
+    :ivar int hits: Number of cache hits of this instance.
+    :ivar int misses: Number of cache misses of this instance.
+
+    Example
+    -------
+    >>> cache = pf.ExecutableCache(max_size=100 * 1024**2)
+    >>> solver = pf.BifurcationProblemSolver(bf, cache=cache)
+    >>> solver.solve()
+    >>> cache.stats()
+    {'hits': 0, 'misses': 1, 'entries': 1, 'size': 61336}
+    """
+
+    suffix = ".out"
+
+    def __init__(self, cache_dir=None, max_size=512 * 1024 ** 2):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock_file = os.path.join(self.cache_dir, ".lock")
+
+    def key(self, source, flags, auto_lib_dir):
+        """Computes the cache key of an executable.
+
+        Parameters
+        ----------
+        source : bytes or str
+            The generated FORTRAN source.
+        flags : list of str
+            Compiler and linker flags used for building the executable.
+        auto_lib_dir : str
+            Directory containing ``libauto.so``.
+        """
+        if isinstance(source, str):
+            source = source.encode()
+        digest = hashlib.sha256()
+        digest.update(source)
+        digest.update(b"\0" + " ".join(flags).encode())
+        digest.update(b"\0" + _compiler_version().encode())
+        digest.update(
+            b"\0" + _file_digest(os.path.join(auto_lib_dir, "libauto.so")).encode()
+        )
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    @contextmanager
+    def _locked(self):
+        with open(self._lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def fetch(self, key, target):
+        """Places the cached executable for ``key`` at ``target``.
+
+        Returns
+        -------
+        bool
+            ``True`` on a cache hit, ``False`` otherwise.
+        """
+        entry = self._entry(key)
+        with self._locked():
+            if not os.path.isfile(entry):
+                self.misses += 1
+                return False
+            try:
+                os.link(entry, target)
+            except OSError:
+                # e.g. target on a different file system
+                shutil.copy2(entry, target)
+            # mark as recently used
+            os.utime(entry)
+        self.hits += 1
+        return True
+
+    def store(self, key, executable):
+        """Adds ``executable`` to the cache under ``key`` and evicts the
+        least recently used entries if the cache is too large."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copy2(executable, tmp_name)
+            with self._locked():
+                os.replace(tmp_name, self._entry(key))
+                os.utime(self._entry(key))
+                self._evict()
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def _entries(self):
+        entries = []
+        for fname in os.listdir(self.cache_dir):
+            if fname.endswith(self.suffix):
+                stat = os.stat(os.path.join(self.cache_dir, fname))
+                entries.append((stat.st_mtime_ns, stat.st_size, fname))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total_size = sum(size for _, size, _ in entries)
+        # always keep the most recently stored entry
+        while total_size > self.max_size and len(entries) > 1:
+            _, size, fname = entries.pop(0)
+            os.remove(os.path.join(self.cache_dir, fname))
+            total_size -= size
+
+    def stats(self):
+        """Returns hit/miss counts of this instance together with the
+        number of entries and the total size of the cache in bytes."""
+        with self._locked():
+            entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "size": sum(size for _, size, _ in entries),
+        }
+
+    def clear(self):
+        """Removes all cached executables."""
+        with self._locked():
+            for _, _, fname in self._entries():
+                os.remove(os.path.join(self.cache_dir, fname))
@@ -0,0 +1,175 @@
+"""Command line interface ``pyfurc``.
+
+``pyfurc solve spec.json`` solves a single problem specification (see
+:func:`pyfurc.spec.problem_from_spec`) and writes the solution file.
+``pyfurc submit``, ``pyfurc worker`` and ``pyfurc status`` operate on a
+:class:`pyfurc.jobs.JobQueue`.
+"""
+import argparse
+import io
+import os
+import sys
+from contextlib import nullcontext, redirect_stdout
+
+from pyfurc.cache import ExecutableCache
+from pyfurc.core import BifurcationProblemSolver
+from pyfurc.jobs import JobQueue, run_workers
+from pyfurc.spec import load_spec, problem_from_spec
+from pyfurc.storage import SolutionStore
+
+
+def _solver_kwargs(args):
+    kwargs = {}
+    if args.cache_dir is not None:
+        kwargs["cache"] = ExecutableCache(cache_dir=args.cache_dir)
+    if args.store_dir is not None:
+        kwargs["store"] = SolutionStore(store_dir=args.store_dir)
+    if args.work_dir is not None:
+        kwargs["work_dir"] = args.work_dir
+    kwargs["backend"] = args.backend
+    if args.timeout is not None:
+        kwargs["timeouts"] = {"run": args.timeout}
+    if args.cpu_time is not None:
+        kwargs["cpu_time"] = args.cpu_time
+    if args.memory is not None:
+        kwargs["memory"] = args.memory * 2 ** 20
+    return kwargs
+
+
+def _solve(args):
+    problem = problem_from_spec(load_spec(args.spec))
+    output = args.output or problem.problem_name + ".pfs"
+    solver = BifurcationProblemSolver(
+        problem, retention=args.retention, **_solver_kwargs(args)
+    )
+    with redirect_stdout(io.StringIO()) if args.quiet else nullcontext():
+        solution = solver.solve()
+    solution.save(output)
+    print(f"Solution written to {output:s}")
+    return 0
+
+
+def _submit(args):
+    queue = JobQueue(args.queue)
+    for fname in args.specs:
+        job_id = None
+        if args.prefix is not None:
+            job_id = args.prefix + os.path.splitext(os.path.basename(fname))[0]
+        print(queue.submit(load_spec(fname), job_id=job_id))
+    return 0
+
+
+def _worker(args):
+    if args.requeue:
+        requeued = JobQueue(args.queue).requeue()
+        print(f"Requeued {len(requeued):d} running job(s)")
+    counts = run_workers(
+        args.queue,
+        workers=args.jobs,
+        watch=args.watch,
+        poll_interval=args.poll_interval,
+        **_solver_kwargs(args),
+    )
+    print(f"{counts['done']:d} job(s) done, {counts['failed']:d} failed")
+    return 1 if counts["failed"] else 0
+
+
+def _status(args):
+    for state, count in JobQueue(args.queue).status().items():
+        print(f"{state:<10s}{count:>8d}")
+    return 0
+
+
+def _add_solver_arguments(parser):
+    parser.add_argument(
+        "--work-dir",
+        help="directory for solution directories, defaults to $PYFURC_WORK_DIR",
+    )
+    parser.add_argument("--cache-dir", help="directory of the executable cache")
+    parser.add_argument("--store-dir", help="directory of the solution store")
+    parser.add_argument(
+        "--backend",
+        choices=BifurcationProblemSolver.solver_backends,
+        default="auto07p",
+        help="solve with AUTO-07p or the NumPy continuation",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="seconds after which AUTO-07p is stopped, keeping the points so far",
+    )
+    parser.add_argument(
+        "--cpu-time", type=float, help="CPU time limit of AUTO-07p in seconds"
+    )
+    parser.add_argument(
+        "--memory", type=int, help="address space limit of AUTO-07p in MiB"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pyfurc", description="AUTO-07p made accessible through python."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="solve a problem specification")
+    solve.add_argument("spec", help="JSON or YAML problem specification")
+    solve.add_argument(
+        "-o", "--output", help="solution file, defaults to {problem_name}.pfs"
+    )
+    solve.add_argument(
+        "--retention",
+        choices=BifurcationProblemSolver.retention_policies,
+        default="delete",
+        help="what to keep of the solution directory",
+    )
+    solve.add_argument(
+        "-q", "--quiet", action="store_true", help="suppress the AUTO-07p output"
+    )
+    _add_solver_arguments(solve)
+    solve.set_defaults(func=_solve)
+
+    submit = commands.add_parser("submit", help="add jobs to a queue")
+    submit.add_argument("queue", help="queue directory")
+    submit.add_argument("specs", nargs="+", help="JSON or YAML problem specifications")
+    submit.add_argument(
+        "--prefix",
+        help="use {prefix}{file name} as job ids instead of random ids",
+    )
+    submit.set_defaults(func=_submit)
+
+    worker = commands.add_parser("worker", help="solve the jobs of a queue")
+    worker.add_argument("queue", help="queue directory")
+    worker.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of worker processes"
+    )
+    worker.add_argument(
+        "--watch", action="store_true", help="keep waiting for new jobs"
+    )
+    worker.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks for new jobs with --watch",
+    )
+    worker.add_argument(
+        "--requeue",
+        action="store_true",
+        help="move running jobs of killed workers back to pending first",
+    )
+    _add_solver_arguments(worker)
+    worker.set_defaults(func=_worker)
+
+    status = commands.add_parser("status", help="show the number of jobs")
+    status.add_argument("queue", help="queue directory")
+    status.set_defaults(func=_status)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
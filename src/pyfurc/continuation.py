@@ -0,0 +1,324 @@
+from collections import deque
+
+import numpy as np
+from sympy import lambdify
+
+from pyfurc.storage import StoredSolutions
+from pyfurc.util import AutoTable
+
+BP, LP, EP, MX = 1, 2, 9, -9
+"""AUTO-07p codes of the point types detected by
+:class:`pyfurc.continuation.NumpyContinuation`."""
+
+
+class _Point:
+    """A point ``x = (U, PAR(1))`` of a branch with its unit tangent."""
+
+    def __init__(self, x, tangent):
+        self.x = x
+        self.tangent = tangent
+        self.type = 0
+        self.label = 0
+
+
+class NumpyContinuation:
+    """Pseudo-arclength continuation of the equilibrium equations of a
+    :class:`pyfurc.core.BifurcationProblem` in the load ``PAR(1)``,
+    implemented with NumPy.
+
+    It is meant for problems with a few DOFs, which are solved in
+    milliseconds this way instead of generating and compiling FORTRAN
+    code. The equilibrium equations and their derivatives are lambdified
+    once. Branch points (BP) are detected by a sign change of the
+    determinant of the extended Jacobian, limit points (LP) by a sign
+    change of the load component of the tangent, and located by the secant
+    method. At branch points the bifurcating branch is followed in both
+    directions.
+
+    The following AUTO-07p parameters of the problem are honored: ``DS``,
+    ``DSMIN``, ``DSMAX``, ``IADS``, ``NMX``, ``RL0``, ``RL1``, ``EPSL``,
+    ``EPSU``, ``EPSS``, ``ITMX``, ``ITNW``, ``MXBF`` and the hidden
+    parameters ``ISP`` (BP detection) and ``ILP`` (LP detection). Only
+    continuations in ``PAR(1)`` starting from the start values of the
+    quantities are supported.
+
+    Parameters
+    ----------
+    problem : :class:`pyfurc.core.BifurcationProblem`
+        The problem to solve.
+
+    Example
+    -------
+    >>> tables, solutions = NumpyContinuation(bf).run()
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        energy = problem.energy
+        quantities = {}
+        for dicti in [energy.dofs, energy.load, energy.params]:
+            quantities.update(dicti)
+        self.ndim = energy.ndofs
+        self._values = [float(info["value"]) for info in quantities.values()]
+        args = list(quantities)
+        self._residual = lambdify(args, energy.equilibrium(), modules="numpy")
+        dfdp = [row[0] for row in energy.parameter_derivatives()]
+        self._jacobian = lambdify(args, [energy.hessian(), dfdp], modules="numpy")
+        constants = dict(problem.problem_parameters)
+        constants.update(problem._other_parameters)
+        if list(constants["ICP"]) != [1] or constants.get("ISW", 1) != 1:
+            raise NotImplementedError(
+                "The NumPy backend only supports continuations in PAR(1)."
+            )
+        self.constants = constants
+
+    def _args(self, x):
+        return list(x) + self._values[self.ndim + 1 :]
+
+    def residual(self, x):
+        return np.array(self._residual(*self._args(x)), dtype=float).reshape(self.ndim)
+
+    def jacobian(self, x):
+        """Derivatives of the equilibrium equations with respect to the
+        DOFs and the load, an ``(NDIM, NDIM + 1)`` array."""
+        hessian, dfdp = self._jacobian(*self._args(x))
+        jac = np.empty((self.ndim, self.ndim + 1))
+        for i, row in enumerate(hessian):
+            for j, entry in enumerate(row):
+                jac[i, j] = entry
+            jac[i, -1] = dfdp[i]
+        return jac
+
+    def _converged(self, x, dx):
+        c = self.constants
+        return abs(dx[-1]) <= c["EPSL"] * (1 + abs(x[-1])) and np.max(
+            np.abs(dx[:-1]), initial=0.0
+        ) <= c["EPSU"] * (1 + np.max(np.abs(x[:-1]), initial=0.0))
+
+    def correct(self, x0, tangent, ds):
+        """Newton corrector of the pseudo-arclength step ``ds`` from ``x0``
+        along ``tangent``. Returns the new point and the number of
+        iterations or ``None`` and the number of iterations if it did
+        not converge."""
+        x = x0 + ds * tangent
+        for iteration in range(1, self.constants["ITNW"] + 1):
+            rhs = np.append(self.residual(x), tangent @ (x - x0) - ds)
+            matrix = np.vstack([self.jacobian(x), tangent])
+            try:
+                dx = np.linalg.solve(matrix, -rhs)
+            except np.linalg.LinAlgError:
+                # exactly at a branch point
+                dx = np.linalg.lstsq(matrix, -rhs, rcond=None)[0]
+            x = x + dx
+            if not np.all(np.isfinite(x)):
+                return None, iteration
+            if self._converged(x, dx):
+                return x, iteration
+        return None, self.constants["ITNW"]
+
+    def tangent(self, x, previous):
+        """Unit tangent at ``x`` oriented like ``previous``."""
+        matrix = np.vstack([self.jacobian(x), previous])
+        rhs = np.zeros(self.ndim + 1)
+        rhs[-1] = 1.0
+        try:
+            tangent = np.linalg.solve(matrix, rhs)
+        except np.linalg.LinAlgError:
+            return previous
+        return tangent / np.linalg.norm(tangent)
+
+    def _test_functions(self, point):
+        """Values of the BP and LP test functions at ``point``."""
+        tests = {}
+        if self.constants["ISP"]:
+            tests[BP] = np.linalg.det(
+                np.vstack([self.jacobian(point.x), point.tangent])
+            )
+        if self.constants["ILP"]:
+            tests[LP] = point.tangent[-1]
+        return tests
+
+    def _locate(self, start, ds, kind, psi_start, psi_end):
+        """Locates the zero of the test function ``kind`` between
+        ``start`` and the step ``ds`` by the secant method with Illinois
+        modification. Returns the point or ``None``."""
+        lower, upper = 0.0, ds
+        psi_lower, psi_upper = psi_start, psi_end
+        located = None
+        for _ in range(self.constants["ITMX"]):
+            step = upper - psi_upper * (upper - lower) / (psi_upper - psi_lower)
+            x, _ = self.correct(start.x, start.tangent, step)
+            if x is None:
+                break
+            located = _Point(x, self.tangent(x, start.tangent))
+            psi = self._test_functions(located)[kind]
+            if abs(upper - lower) <= self.constants["EPSS"] * abs(ds) or psi == 0:
+                break
+            if np.sign(psi) == np.sign(psi_upper):
+                upper, psi_upper = step, psi
+                psi_lower /= 2
+            else:
+                lower, psi_lower = upper, psi_upper
+                upper, psi_upper = step, psi
+        return located
+
+    def _branch_direction(self, point):
+        """Direction of the branch bifurcating at the branch point
+        ``point``: the vector of the two-dimensional null space of the
+        Jacobian that is orthogonal to the current tangent."""
+        _, _, vh = np.linalg.svd(self.jacobian(point.x))
+        first, second = vh[-2], vh[-1]
+        direction = (point.tangent @ first) * second - (point.tangent @ second) * first
+        direction /= np.linalg.norm(direction)
+        return direction * np.sign(direction[np.argmax(np.abs(direction))])
+
+    def _follow(self, start, ds, skip_first):
+        """Follows one branch from ``start`` with the initial step ``ds``.
+        Returns the list of points and the detected branch points."""
+        c = self.constants
+        points = [start]
+        branch_points = []
+        current = start
+        tests = None if skip_first else self._test_functions(start)
+        while True:
+            x, iterations = self.correct(current.x, current.tangent, ds)
+            if x is None:
+                if abs(ds) / 2 < c["DSMIN"]:
+                    current.type = MX
+                    return points, branch_points
+                ds /= 2
+                continue
+            new = _Point(x, self.tangent(x, current.tangent))
+            new_tests = self._test_functions(new)
+            if tests is not None:
+                found = [
+                    kind
+                    for kind, psi in new_tests.items()
+                    if np.sign(psi) != np.sign(tests[kind]) and tests[kind] != 0
+                ]
+                if found:
+                    kind = found[0]
+                    special = self._locate(
+                        current, ds, kind, tests[kind], new_tests[kind]
+                    )
+                    if special is not None:
+                        # continue from the special point like AUTO-07p
+                        special.type = kind
+                        special.tangent = current.tangent
+                        points.append(special)
+                        if kind == BP:
+                            branch_points.append(special)
+                        current = special
+                        tests = dict(tests)
+                        tests[kind] = -tests[kind]
+                        continue
+            tests = new_tests
+            points.append(new)
+            current = new
+            if not c["RL0"] <= new.x[-1] <= c["RL1"] or len(points) >= c["NMX"]:
+                new.type = EP
+                return points, branch_points
+            if c["IADS"] and (len(points) - 1) % c["IADS"] == 0:
+                ds = self._adapt_step(ds, iterations)
+
+    def _adapt_step(self, ds, iterations):
+        """Step size adaptation of AUTO-07p (``ADPTDS``) based on the
+        number of Newton iterations of the last step."""
+        itnw = self.constants["ITNW"]
+        if iterations <= 1:
+            ds *= 2.0
+        elif iterations == 2:
+            ds *= 1.5
+        elif iterations <= itnw // 2:
+            ds *= 1.1
+        elif iterations >= itnw:
+            ds *= 0.5
+        return np.sign(ds) * min(abs(ds), self.constants["DSMAX"])
+
+    def _start_point(self):
+        x = np.array(self._values[: self.ndim + 1])
+        jac = self.jacobian(x)
+        try:
+            x[:-1] -= np.linalg.solve(jac[:, :-1], self.residual(x))
+        except np.linalg.LinAlgError:
+            pass
+        # tangent pointing in direction of increasing load
+        tangent = np.zeros(self.ndim + 1)
+        tangent[-1] = 1.0
+        return _Point(x, self.tangent(x, tangent))
+
+    def run(self):
+        """Computes all branches.
+
+        Returns
+        -------
+        tuple
+            One :class:`pyfurc.util.AutoTable` per branch and direction as
+            in ``fort.7`` and the labeled solutions as
+            :class:`pyfurc.storage.StoredSolutions`.
+        """
+        c = self.constants
+        start = self._start_point()
+        start.type = EP
+        points, branch_points = self._follow(start, c["DS"], skip_first=False)
+        branches = [(1, points)]
+        queue = deque(branch_points[: abs(c["MXBF"])])
+        treated = len(queue)
+        while queue:
+            bp = queue.popleft()
+            direction = self._branch_direction(bp)
+            signs = [1, -1] if c["MXBF"] > 0 else [1]
+            number = branches[-1][0] + 1
+            for sign in signs:
+                branch_start = _Point(bp.x, sign * direction)
+                points, found = self._follow(branch_start, abs(c["DS"]), True)
+                branches.append((number, points))
+                new = found[: max(abs(c["MXBF"]) - treated, 0)]
+                treated += len(new)
+                queue.extend(new)
+        return self._tables(branches)
+
+    def _tables(self, branches):
+        npar = self.problem._other_parameters["NPAR"]
+        tables = []
+        labels, headers, u, par = [], [], [], []
+        for number, points in branches:
+            for point in points:
+                if point.type != 0:
+                    point.label = len(labels) + 1
+                    labels.append(point.label)
+            table = AutoTable()
+            xs = np.array([point.x for point in points])
+            table["BR"] = np.full(len(points), number, dtype=np.int64)
+            table["PT"] = np.arange(1, len(points) + 1, dtype=np.int64)
+            table["TY"] = np.array([point.type for point in points], dtype=np.int64)
+            table["LAB"] = np.array([point.label for point in points], dtype=np.int64)
+            table["PAR(1)"] = xs[:, -1].copy()
+            table["L2-NORM"] = np.linalg.norm(xs[:, :-1], axis=1)
+            for i in range(self.ndim):
+                table[f"U({i + 1:d})"] = xs[:, i].copy()
+            tables.append(table)
+            for row, point in enumerate(points):
+                if point.label:
+                    headers.append(
+                        {
+                            "IBR": number,
+                            "NTOT": row + 1,
+                            "ITP": point.type,
+                            "LAB": point.label,
+                            "NFPR": 1,
+                            "ISW": 1,
+                            "NTPL": 1,
+                            "NAR": self.ndim + 1,
+                            "NROWPR": 0,
+                            "NTST": 1,
+                            "NCOL": 0,
+                            "NPAR": npar,
+                        }
+                    )
+                    u.append(point.x[:-1])
+                    par.append([point.x[-1]] + self._values[self.ndim + 1 :])
+        solutions = StoredSolutions(
+            labels, headers, np.array(u), np.array(par).reshape(len(labels), npar)
+        )
+        return tables, solutions
@@ -1,23 +1,72 @@
+import ast
+import asyncio
+import hashlib
+import json
 import os
+import re
 import shutil
-from subprocess import PIPE, Popen
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from warnings import warn
 
+import numpy as np
+import sympy
+from sympy import Add, Basic, Derivative
 from sympy import Expr as spexpr
-from sympy import Rational, Symbol, nfloat
+from sympy import Rational, Symbol, count_ops, cse, lambdify, nfloat, numbered_symbols
 from sympy import pi as sp_pi
 from sympy import sin as sp_sin
-
-from pyfurc.tools import setup_auto_exec_env
+from sympy import srepr, sympify
+
+import pyfurc
+from pyfurc.continuation import NumpyContinuation
+from pyfurc.profiling import SolveProfile
+from pyfurc.storage import read_solution_file, write_solution_file
+from pyfurc.tools import (
+    STPNT_ENV_VAR,
+    build_auto_executable,
+    build_auto_executable_async,
+    kill_process_group,
+    run_auto_executable_async,
+    run_status,
+    setup_auto_exec_env,
+    start_auto_executable,
+    wait_auto_executable,
+)
 from pyfurc.util import (
-    AutoCodePrinter,
     AutoOutputReader,
     AutoParameters,
     DataDir,
+    Fort7Parser,
+    Fort8Reader,
     HiddenAutoParameters,
+    ParamDict,
+    PointIndex,
+    labeled_points,
+    point_type_name,
 )
 
 
+class _LazyCodePrinter:
+    """Creates a :class:`pyfurc.printing.AutoCodePrinter` on first access,
+    so that the sympy code printers are only imported when code is
+    generated."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        from pyfurc.printing import AutoCodePrinter
+
+        printer = AutoCodePrinter()
+        obj.__dict__[self.name] = printer
+        return printer
+
+
 class PhysicalQuantity(Symbol):
     """Fundamental class for degrees of freedom, loads and parameters.
 
@@ -50,6 +99,30 @@ class PhysicalQuantity(Symbol):
         obj.value = value
         return obj
 
+    def __reduce__(self):
+        # sympy would recreate the symbol from its name only
+        return (
+            _rebuild_quantity,
+            (type(self), self.name, self.quantity_type, self.value, self._name),
+        )
+
+    def to_dict(self):
+        """Returns a JSON serializable description of the quantity, see
+        :meth:`from_dict`."""
+        return {
+            "name": self.name,
+            "quantity_type": self.quantity_type,
+            "value": float(self.value),
+        }
+
+    @staticmethod
+    def from_dict(data):
+        """Creates a :class:`pyfurc.core.Dof`, :class:`pyfurc.core.Load`
+        or :class:`pyfurc.core.Parameter` from a dictionary returned by
+        :meth:`to_dict`."""
+        cls = _quantity_classes[data["quantity_type"]]
+        return cls(data["name"], value=data["value"])
+
 
 class Dof(PhysicalQuantity):
     """Class used for defining degrees of freedom. Shortcut for
@@ -113,23 +186,178 @@ class Parameter(PhysicalQuantity):
         return obj
 
 
+_quantity_classes = {"dof": Dof, "load": Load, "parameter": Parameter}
+
+
+def _rebuild_quantity(cls, name, quantity_type, value, fortran_name):
+    if cls in _quantity_classes.values():
+        obj = cls(name, value=value)
+    else:
+        obj = cls(name, quantity_type, value=value)
+    obj._name = fortran_name
+    return obj
+
+
+# constructors that take a string argument in the output of sympy.srepr
+_srepr_string_constructors = ("Symbol", "Float", "Function")
+# classes in the output of sympy.srepr that are not in the sympy namespace
+_srepr_classes = {"ExprCondPair": sympy.functions.elementary.piecewise.ExprCondPair}
+
+
+def _parse_srepr(text):
+    """Rebuilds an expression from its :func:`sympy.srepr` without
+    evaluating ``text`` as python code.
+
+    Only calls of sympy classes, sympy singletons such as ``pi`` and
+    numbers are accepted. Strings are only accepted as arguments of
+    ``Symbol``, ``Float`` and ``Function``, since other constructors would
+    sympify, i.e. evaluate, them.
+
+    Raises
+    ------
+    ValueError
+        If ``text`` contains anything else.
+    """
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid expression: {exc.msg}") from exc
+    return _build_srepr_node(tree.body, text)
+
+
+def _sympy_name(node, text, cls=False):
+    """Returns the sympy class (``cls=True``) or singleton named by
+    ``node``."""
+    obj = None
+    if isinstance(node, ast.Name):
+        obj = _srepr_classes.get(node.id, getattr(sympy, node.id, None))
+    if cls and isinstance(obj, type) and issubclass(obj, Basic):
+        return obj
+    if not cls and isinstance(obj, Basic):
+        return obj
+    raise ValueError(
+        f"Unsupported term {ast.get_source_segment(text, node)!r} in expression."
+    )
+
+
+def _build_srepr_node(node, text, strings=False):
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float, bool):
+        return node.value
+    if isinstance(node, ast.Constant) and isinstance(node.value, str) and strings:
+        return node.value
+    if (
+        isinstance(node, ast.UnaryOp)
+        and isinstance(node.op, ast.USub)
+        and isinstance(node.operand, ast.Constant)
+        and type(node.operand.value) in (int, float)
+    ):
+        return -node.operand.value
+    if isinstance(node, ast.Name):
+        return _sympy_name(node, text)
+    if isinstance(node, ast.Call):
+        if isinstance(node.func, ast.Call):
+            # undefined functions, e.g. Function('f')(Symbol('x'))
+            func = _build_srepr_node(node.func, text)
+        else:
+            func = _sympy_name(node.func, text, cls=True)
+        strings = isinstance(node.func, ast.Name) and (
+            node.func.id in _srepr_string_constructors
+        )
+        args = [_build_srepr_node(arg, text, strings) for arg in node.args]
+        kwargs = {}
+        for keyword in node.keywords:
+            value = keyword.value
+            if not (
+                keyword.arg is not None
+                and isinstance(value, ast.Constant)
+                and type(value.value) in (int, bool)
+            ):
+                raise ValueError(
+                    f"Unsupported argument in "
+                    f"{ast.get_source_segment(text, node)!r} in expression."
+                )
+            kwargs[keyword.arg] = value.value
+        return func(*args, **kwargs)
+    raise ValueError(
+        f"Unsupported term {ast.get_source_segment(text, node)!r} in expression."
+    )
+
+
+def _rebuild_energy(expr, backend, values):
+    energy = Energy(expr, backend=backend)
+    energy._restore_values(values)
+    return energy
+
+
+def _import_symengine():
+    """Returns the symengine module or ``None`` if it is not installed."""
+    try:
+        import symengine
+    except ImportError:
+        return None
+    return symengine
+
+
+def _from_symengine_entry(entry):
+    """Converts a SymEngine expression to sympy. SymEngine leaves the
+    derivatives of some functions unevaluated, e.g. of ``Max``, these are
+    evaluated by sympy."""
+    entry = sympify(entry)
+    if entry.has(Derivative):
+        entry = entry.doit()
+    return entry
+
+
+def _quantity_sort_key(quantity):
+    """Natural sort key of a quantity, so that e.g. ``phi_2`` comes
+    before ``phi_10``."""
+    parts = re.split(r"(\d+)", quantity.name)
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts, quantity.quantity_type
+
+
 class Energy(spexpr):
     """Container class for energy expressions.
 
     Parameters
     ----------
     expr : valid sympy Expression e.g. ``sympy.Mul`` or ``sympy.Add`` containing exactly one `pyfurc.core.PhysicalQuantity` with ``quantity_type="load"``
+    backend : str, optional
+        Library used for differentiation, one of ``symbolic_backends``.
+        ``"symengine"`` is much faster for large energies and requires the
+        SymEngine python bindings. If they are not installed, a warning is
+        issued and sympy is used, as for energies that SymEngine cannot
+        convert. Derivatives that SymEngine leaves unevaluated are
+        evaluated by sympy. The derivatives are converted to sympy
+        expressions in both cases. Default is ``"sympy"``.
 
     """
 
-    def __init__(self, expr):
+    symbolic_backends = ("sympy", "symengine")
+
+    def __new__(cls, expr, backend="sympy"):
+        return super().__new__(cls, expr)
+
+    def __init__(self, expr, backend="sympy"):
+        if backend not in self.symbolic_backends:
+            raise ValueError(
+                "backend has to be one of: " + ", ".join(self.symbolic_backends)
+            )
+        if backend == "symengine" and _import_symengine() is None:
+            warn("SymEngine is not installed, falling back to sympy.", RuntimeWarning)
+            backend = "sympy"
+        self.backend = backend
         self.expr = expr
         self.dofs = {}
         self.params = {}
         self.ndofs = 0
         self.nparams = 0
         load_defined = 0
-        for atom in expr.atoms():
+        quantities = sorted(
+            (atom for atom in expr.atoms() if isinstance(atom, PhysicalQuantity)),
+            key=_quantity_sort_key,
+        )
+        for atom in quantities:
             if isinstance(atom, (Dof, Load, Parameter, PhysicalQuantity)):
                 if atom.quantity_type == "dof":
                     self.ndofs += 1
@@ -151,6 +379,19 @@ class Energy(spexpr):
             raise NotImplementedError(
                 "You have to define exactly one load. Other cases are not implemented."
             )
+        if self.backend == "symengine":
+            symengine = _import_symengine()
+            try:
+                self._symengine_expr = symengine.sympify(
+                    expr.xreplace(self._plain_symbols())
+                )
+            except (symengine.SympifyError, RuntimeError) as exc:
+                warn(
+                    f"SymEngine cannot convert the energy ({exc}), falling back to "
+                    "sympy.",
+                    RuntimeWarning,
+                )
+                self.backend = "sympy"
 
     # TODO fix repr and str for pretty printing and print dofs, load and parameters
     def __repr__(self):
@@ -198,7 +439,37 @@ class Energy(spexpr):
             )
         print(infostr)
 
+    def _plain_symbols(self):
+        """Maps the quantities to plain symbols named after their FORTRAN
+        names, which SymEngine can convert back and forth."""
+        quantities = {}
+        for dicti in [self.dofs, self.params, self.load]:
+            quantities.update(dicti)
+        return {qty: Symbol(info["name"]) for qty, info in quantities.items()}
+
+    def _symengine_derivatives(self, variables, exprs=None):
+        """Derivatives of ``exprs`` (default: the energy) with respect to
+        ``variables`` computed with SymEngine. Returns the derivatives as
+        SymEngine expressions in terms of the plain symbols."""
+        symengine = _import_symengine()
+        plain = self._plain_symbols()
+        if exprs is None:
+            exprs = [self._symengine_expr]
+        variables = [symengine.sympify(plain[var]) for var in variables]
+        return [[expr.diff(var) for var in variables] for expr in exprs]
+
+    def _from_symengine(self, rows):
+        """Converts nested lists of SymEngine expressions in terms of the
+        plain symbols to sympy expressions in terms of the quantities."""
+        quantities = {plain: qty for qty, plain in self._plain_symbols().items()}
+        return [
+            [_from_symengine_entry(entry).xreplace(quantities) for entry in row]
+            for row in rows
+        ]
+
     def equilibrium(self):
+        if self.backend == "symengine":
+            return self._from_symengine(self._symengine_derivatives(self.dofs))[0]
         eq_exprs = []
         for dof, _ in self.dofs.items():
             try:
@@ -209,6 +480,41 @@ class Energy(spexpr):
             eq_exprs.append(eq)
         return eq_exprs
 
+    def hessian(self):
+        """Derivatives of the equilibrium equations with respect to the
+        degrees of freedom.
+
+        Returns
+        -------
+        list of list
+            ``hess[i][j]`` is the derivative of the ``i``-th equilibrium
+            equation with respect to ``U(j+1)``.
+        """
+        if self.backend == "symengine":
+            (gradient,) = self._symengine_derivatives(self.dofs)
+            return self._from_symengine(
+                self._symengine_derivatives(self.dofs, gradient)
+            )
+        return [[eq.diff(dof) for dof in self.dofs] for eq in self.equilibrium()]
+
+    def parameter_derivatives(self):
+        """Derivatives of the equilibrium equations with respect to the
+        load and the parameters.
+
+        Returns
+        -------
+        list of list
+            ``dfdp[i][k]`` is the derivative of the ``i``-th equilibrium
+            equation with respect to ``PAR(k+1)``.
+        """
+        quantities = list(self.load) + list(self.params)
+        if self.backend == "symengine":
+            (gradient,) = self._symengine_derivatives(self.dofs)
+            return self._from_symengine(
+                self._symengine_derivatives(quantities, gradient)
+            )
+        return [[eq.diff(qty) for qty in quantities] for eq in self.equilibrium()]
+
     def set_quantity_value(self, key, value):
         found = False
         for dicti in [self.params, self.dofs, self.load]:
@@ -218,6 +524,198 @@ class Energy(spexpr):
         if not found:
             raise KeyError(f"Variable {str(key):s} not found")
 
+    def __reduce__(self):
+        return (_rebuild_energy, (self.expr, self.backend, self._quantity_records()))
+
+    def _quantity_records(self):
+        """Describes every quantity with its FORTRAN name and current value."""
+        records = []
+        for dicti in [self.dofs, self.load, self.params]:
+            for qty, info in dicti.items():
+                record = qty.to_dict()
+                record["fortran_name"] = info["name"]
+                record["value"] = float(info["value"])
+                records.append(record)
+        return records
+
+    def _restore_values(self, records):
+        """Sets the values of the quantities from ``records`` and checks
+        that they are numbered as when the records were made."""
+        infos = {}
+        for dicti in [self.dofs, self.load, self.params]:
+            for qty, info in dicti.items():
+                infos[qty.name, qty.quantity_type] = info
+        for record in records:
+            info = infos.get((record["name"], record["quantity_type"]))
+            if info is None or info["name"] != record["fortran_name"]:
+                raise ValueError(
+                    f"Quantity {record['name']:s} is not numbered "
+                    f"{record['fortran_name']:s} in the restored energy."
+                )
+            info["value"] = record["value"]
+
+    def to_dict(self):
+        """Returns a JSON serializable description of the energy, see
+        :meth:`from_dict`.
+
+        The expression is stored as :func:`sympy.srepr` in terms of the
+        FORTRAN names, so display names need not be valid python
+        identifiers. The quantities are stored with their FORTRAN names
+        and current values.
+        """
+        return {
+            "expr": srepr(self.expr.xreplace(self._plain_symbols())),
+            "backend": self.backend,
+            "quantities": self._quantity_records(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates an energy from a dictionary returned by :meth:`to_dict`.
+
+        The expression is rebuilt from its ``srepr`` without evaluating it
+        as python code, so dictionaries received from other machines cannot
+        execute code.
+
+        Raises
+        ------
+        ValueError
+            If the expression contains anything but sympy objects and
+            numbers or if the DOFs or parameters would be numbered
+            differently.
+        """
+        quantities = {
+            Symbol(record["fortran_name"]): PhysicalQuantity.from_dict(record)
+            for record in data["quantities"]
+        }
+        expr = _parse_srepr(data["expr"]).xreplace(quantities)
+        energy = cls(expr, backend=data.get("backend", "sympy"))
+        energy._restore_values(data["quantities"])
+        return energy
+
+
+class _StatementPrinter:
+    """Prints ``(lhs, expr)`` assignments as FORTRAN statements.
+
+    gfortran needs time superlinear in the number of terms of a sum, so no
+    sum in a statement has more than ``max_statement_terms`` terms. Longer
+    sums are accumulated over several statements, nested ones are first
+    computed in temporaries ``SUM1``, ``SUM2``, ...
+
+    With ``wrap_lines=False`` statements are not wrapped and have to be
+    wrapped with :meth:`wrap` before they are written. The temporaries are
+    named ``temporary_prefix`` followed by their number.
+    """
+
+    def __init__(self, max_statement_terms, wrap_lines=True, temporary_prefix="SUM"):
+        from pyfurc.printing import AutoCodePrinter
+
+        self.max_statement_terms = max_statement_terms
+        self.wrap_lines = wrap_lines
+        self.temporary_prefix = temporary_prefix
+        self._f_printer = AutoCodePrinter(wrap_lines=wrap_lines)
+
+    def print_assignments(self, assignments, temporaries=None):
+        """Returns the statements computing ``assignments``. Names of
+        temporaries are appended to ``temporaries``."""
+        if temporaries is None:
+            temporaries = []
+        statements = []
+        for lhs, expr in assignments:
+            self._print_assignment(lhs, expr, statements, temporaries)
+        return statements
+
+    def _print_assignment(self, lhs, expr, statements, temporaries):
+        expr = self._hoist_long_sums(expr, statements, temporaries, top_level=True)
+        target = Symbol(lhs)
+        terms = expr.args if expr.is_Add else (expr,)
+        size = self.max_statement_terms
+        statements.append(self._doprint(target, Add(*terms[:size])))
+        for start in range(size, len(terms), size):
+            partial_sum = target + Add(*terms[start : start + size])
+            statements.append(self._doprint(target, partial_sum))
+
+    def _doprint(self, target, expr):
+        code = self._f_printer.doprint(expr, assign_to=target)
+        return code.lstrip() if self.wrap_lines else code
+
+    def wrap(self, statement):
+        return self._f_printer.wrap(statement).lstrip()
+
+    def _hoist_long_sums(self, expr, statements, temporaries, top_level=False):
+        if expr.is_Atom:
+            return expr
+        args = [
+            self._hoist_long_sums(arg, statements, temporaries) for arg in expr.args
+        ]
+        if any(new is not old for new, old in zip(args, expr.args)):
+            expr = expr.func(*args)
+        if expr.is_Add and len(expr.args) > self.max_statement_terms and not top_level:
+            name = f"{self.temporary_prefix}{len(temporaries) + 1:d}"
+            temporaries.append(name)
+            self._print_assignment(name, expr, statements, temporaries)
+            return Symbol(name)
+        return expr
+
+
+_worker_state = {}
+
+# Prefix of the temporaries printed in worker processes. "#" cannot occur
+# in FORTRAN names, so renumbering them cannot change any other name.
+_WORKER_TEMPORARY_PREFIX = "SUM#"
+
+
+def _init_derivatives_worker(expr, backend):
+    """Initializer of the processes differentiating an energy. ``expr`` is
+    sent only once per process instead of once per job."""
+    if backend == "symengine":
+        expr = _import_symengine().sympify(expr)
+    _worker_state["expr"] = expr
+    _worker_state["backend"] = backend
+
+
+def _derivatives_job(dof, dofs, parameters, jacobian):
+    """Returns the equilibrium equation belonging to ``dof`` and, if
+    ``jacobian`` is set, its derivatives with respect to ``dofs`` and
+    ``parameters`` as sympy expressions."""
+    expr = _worker_state["expr"]
+    if _worker_state["backend"] == "symengine":
+        symengine = _import_symengine()
+        dof = symengine.sympify(dof)
+        dofs = [symengine.sympify(var) for var in dofs]
+        parameters = [symengine.sympify(var) for var in parameters]
+    eq = expr.diff(dof)
+    hess_row = [eq.diff(var) for var in dofs] if jacobian else []
+    dfdp_row = [eq.diff(var) for var in parameters] if jacobian else []
+    if _worker_state["backend"] == "symengine":
+        eq = _from_symengine_entry(eq)
+        hess_row = [_from_symengine_entry(entry) for entry in hess_row]
+        dfdp_row = [_from_symengine_entry(entry) for entry in dfdp_row]
+    return eq, hess_row, dfdp_row
+
+
+def _print_assignments_job(max_statement_terms, assignments):
+    """Prints ``assignments`` in a worker process. Returns the unwrapped
+    statements and the number of temporaries, which are named
+    ``SUM#1``, ``SUM#2``, ... until renumbered with
+    :func:`_renumber_temporaries`."""
+    temporaries = []
+    printer = _StatementPrinter(
+        max_statement_terms,
+        wrap_lines=False,
+        temporary_prefix=_WORKER_TEMPORARY_PREFIX,
+    )
+    return printer.print_assignments(assignments, temporaries), len(temporaries)
+
+
+def _renumber_temporaries(statements, offset):
+    """Renames the temporaries ``SUM#n`` of a worker to ``SUM{n + offset}``."""
+    pattern = re.escape(_WORKER_TEMPORARY_PREFIX) + r"(\d+)"
+    return [
+        re.sub(pattern, lambda m: f"SUM{int(m.group(1)) + offset:d}", stmt)
+        for stmt in statements
+    ]
+
 
 class BifurcationProblem:
     """Class for holding information on a bifurcation problem.
@@ -234,6 +732,26 @@ class BifurcationProblem:
     name : str, optional
         Name of the bifurcation problem. The calculation output folder
         will contain this name and a timestamp.
+    params : dict, optional
+        Values to update the default :class:`pyfurc.util.AutoParameters` with.
+    analytic_jacobian : bool, optional
+        If ``True``, the derivatives of the equilibrium equations are
+        derived symbolically and passed to AUTO-07p (``JAC=1``). Otherwise
+        AUTO-07p uses finite differences. Default is ``False``.
+    cse : bool, optional
+        If ``True``, common subexpressions of the equilibrium equations
+        (and of the Jacobian, if ``analytic_jacobian`` is set) are
+        extracted into local variables of the generated FORTRAN code.
+        The operation count reduction is stored in ``cse_report`` once the
+        code has been generated. Default is ``False``.
+    detect_folds : bool, optional
+        If ``True``, limit points (LP) are detected and labeled
+        (``ILP=1``). Default is ``False``.
+    processes : int, optional
+        Number of worker processes used to differentiate the energy per
+        DOF and to print the FORTRAN statements. ``None`` uses all CPUs.
+        The generated code does not depend on it. Default is 1, i.e. no
+        worker processes, which is fastest for small problems.
 
     Variables
     ---------
@@ -241,9 +759,23 @@ class BifurcationProblem:
     :ivar dict dofs: Reference to ``energy.dofs``, dictionary holding ``dof`` names and values.
     :ivar pyfurc.util.ProblemParameters problem_parameters: AUTO-7p calculation parameters.
     :ivar str problem_name: Name of the bifurcation problem passed on instantiation. The calculation output folder will contain this name.
+    :ivar int max_statement_terms: Maximum number of terms of a sum in a
+        single FORTRAN statement, by default 50. Longer sums are split
+        into several statements, which keeps compile times down.
     """
 
-    def __init__(self, energy, name="pyfurc_problem", params=None):
+    max_statement_terms = 50
+
+    def __init__(
+        self,
+        energy,
+        name="pyfurc_problem",
+        params=None,
+        analytic_jacobian=False,
+        cse=False,
+        detect_folds=False,
+        processes=1,
+    ):
         self.energy = energy
         self.dofs = energy.dofs
         self._solved = False
@@ -259,8 +791,15 @@ class BifurcationProblem:
                 "NPAR": self.energy.nparams + 1,
             }
         )
-
-        self._f_printer = AutoCodePrinter()
+        self.analytic_jacobian = analytic_jacobian
+        if analytic_jacobian:
+            self._other_parameters["JAC"] = 1
+        self.cse = cse
+        self.cse_report = None
+        if detect_folds:
+            self._other_parameters["ILP"] = 1
+        self.processes = processes
+        self._hessian_function = None
 
     def set_parameter(self, param, value):
         """Recommended way of changing values in ``problem_parameters``.
@@ -332,41 +871,655 @@ class BifurcationProblem:
         """
         self.energy.set_quantity_value(param, value)
 
+    def __getstate__(self):
+        # the solution and lambdified functions are not sent along
+        state = self.__dict__.copy()
+        for key in ["dofs", "solution", "_hessian_function"]:
+            state.pop(key, None)
+        state["_solved"] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.dofs = self.energy.dofs
+        self._hessian_function = None
+
+    def to_dict(self):
+        """Returns a JSON serializable description of the problem, see
+        :meth:`from_dict`. Like pickling, it does not include the
+        solution.
+
+        Example
+        -------
+        >>> data = bf.to_dict()
+        >>> bf2 = pf.BifurcationProblem.from_dict(data)
+        >>> bf2.fingerprint() == bf.fingerprint()
+        True
+        """
+        return {
+            "name": self.problem_name,
+            "energy": self.energy.to_dict(),
+            "auto_parameters": dict(self.problem_parameters),
+            "hidden_auto_parameters": dict(self._other_parameters),
+            "analytic_jacobian": self.analytic_jacobian,
+            "cse": self.cse,
+            "processes": self.processes,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates a problem from a dictionary returned by :meth:`to_dict`."""
+        problem = cls(
+            Energy.from_dict(data["energy"]),
+            name=data["name"],
+            params=data["auto_parameters"],
+            analytic_jacobian=data["analytic_jacobian"],
+            cse=data["cse"],
+            processes=data["processes"],
+        )
+        problem._other_parameters.update(data["hidden_auto_parameters"])
+        return problem
+
+    def to_json(self, **kwargs):
+        """Returns :meth:`to_dict` as JSON string. ``kwargs`` are passed
+        on to :func:`json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_json(cls, content):
+        """Creates a problem from a JSON string returned by :meth:`to_json`."""
+        return cls.from_dict(json.loads(content))
+
+    def metadata(self):
+        """Returns a JSON serializable description of the problem: its
+        name, the energy expression, the mapping of FORTRAN names to the
+        quantities and their values and the AUTO-07p parameters."""
+
+        def quantities(dicti):
+            return {
+                info["name"]: {"name": qty.name, "value": float(info["value"])}
+                for qty, info in dicti.items()
+            }
+
+        return {
+            "problem_name": self.problem_name,
+            "energy": str(self.energy.expr),
+            "dofs": quantities(self.energy.dofs),
+            "params": quantities(self.energy.params),
+            "load": quantities(self.energy.load),
+            "auto_parameters": dict(self.problem_parameters),
+            "hidden_auto_parameters": dict(self._other_parameters),
+        }
+
+    def fingerprint(self, backend=None):
+        """Returns a stable hash of everything the results depend on.
+
+        The hash covers the energy expression in terms of the FORTRAN
+        names ``U(i)`` and ``PAR(i)``, the values of all quantities and
+        the AUTO-07p parameters. It does not depend on the problem name or
+        the display names of the quantities and is the same across python
+        sessions, so it identifies problems that have already been solved.
+
+        Parameters
+        ----------
+        backend : str, optional
+            Solver backend, see
+            :attr:`pyfurc.core.BifurcationProblemSolver.solver_backends`.
+            If given, it is part of the hash, since the backends take
+            different steps.
+
+        Returns
+        -------
+        str
+            Hexadecimal sha256 digest.
+        """
+        quantities = {}
+        for dicti in [self.energy.dofs, self.energy.params, self.energy.load]:
+            quantities.update(dicti)
+        expr = self.energy.expr.xreplace(
+            {qty: Symbol(info["name"]) for qty, info in quantities.items()}
+        )
+        description = {
+            "version": pyfurc.__version__,
+            "energy": srepr(expr),
+            "values": {
+                info["name"]: repr(float(info["value"])) for info in quantities.values()
+            },
+            "auto_parameters": dict(self.problem_parameters),
+            "hidden_auto_parameters": dict(self._other_parameters),
+        }
+        if backend is not None:
+            description["backend"] = backend
+        content = json.dumps(description, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def classify_stability(self, solution, tol=0.0):
+        """Classifies the stability of all points of ``solution``.
+
+        The Hessian of the energy with respect to the DOFs is lambdified
+        once and evaluated for all points of a table at once. The smallest
+        eigenvalue of each Hessian is added as column ``MIN_EIG`` to the
+        tables of ``solution.raw_data``, the column ``STABLE`` is ``True``
+        where it is larger than ``tol``, i.e. where the energy has a strict
+        local minimum.
+
+        Parameters that are not a column of a table are evaluated at their
+        current value. AUTO-07p writes at most seven columns of
+        continuation parameters and DOFs to ``fort.7``, so tables of
+        problems with more DOFs lack some of them. Such tables are skipped
+        with a warning.
+
+        Parameters
+        ----------
+        solution : :class:`pyfurc.core.BifurcationProblemSolution`
+            A solution of this problem.
+        tol : float, optional
+            Smallest eigenvalue considered positive. Default is 0.0.
+        """
+        quantities = {}
+        for dicti in [self.energy.dofs, self.energy.load, self.energy.params]:
+            quantities.update(dicti)
+        if self._hessian_function is None:
+            self._hessian_function = lambdify(
+                list(quantities), self.energy.hessian(), modules="numpy"
+            )
+        ndofs = self.energy.ndofs
+        dof_names = [info["name"] for info in self.energy.dofs.values()]
+        for table in solution.raw_data:
+            missing = [name for name in dof_names if name not in table]
+            if missing:
+                warn(
+                    f"Skipping stability of branch {table['BR'][0]:d}, "
+                    f"fort.7 does not contain {', '.join(missing)}.",
+                    RuntimeWarning,
+                )
+                continue
+            args = [
+                table.get(info["name"], float(info["value"]))
+                for info in quantities.values()
+            ]
+            hessians = np.empty((table.n_rows, ndofs, ndofs))
+            for i, row in enumerate(self._hessian_function(*args)):
+                for j, entry in enumerate(row):
+                    hessians[:, i, j] = entry
+            min_eig = np.linalg.eigvalsh(hessians)[:, 0]
+            table["MIN_EIG"] = min_eig
+            table["STABLE"] = min_eig > tol
+
+    def track_critical_point(self, solution, label, parameter, **auto_params):
+        """Continues a limit point (LP) or branch point (BP) of ``solution``
+        in two parameters, the load ``PAR(1)`` and ``parameter``.
+
+        AUTO-07p is restarted from the critical point with ``ISW=2`` and
+        ``ICP=[1, k]``, where ``PAR(k)`` is ``parameter``, so that it
+        follows the critical point itself. The resulting branch is the
+        stability boundary in the plane of the load and ``parameter``,
+        i.e. the columns ``PAR(1)`` and ``PAR(k)`` of its tables. Limit
+        points are only labeled if the problem was created with
+        ``detect_folds=True``.
+
+        Parameters
+        ----------
+        solution : :class:`pyfurc.core.BifurcationProblemSolution`
+            A solution of this problem containing the critical point.
+        label : int
+            Label of the critical point.
+        parameter : :class:`pyfurc.core.Parameter`
+            The second free parameter.
+        **auto_params
+            Further AUTO-07p constants, e.g. ``DS``, ``NMX`` or ``RL0`` and
+            ``RL1`` bounding the load.
+
+        Returns
+        -------
+        :class:`pyfurc.core.BifurcationProblemSolution`
+            The branch of critical points, linked to ``solution`` as in
+            :meth:`pyfurc.core.BifurcationProblemSolution.continue_from`.
+            Its labeled solutions contain the state vector extended by
+            AUTO-07p's additional unknowns.
+
+        Example
+        -------
+        >>> bf = pf.BifurcationProblem(V, name="imperfect", detect_folds=True)
+        >>> solution = pf.BifurcationProblemSolver(bf).solve()
+        >>> lp = solution.points(type="LP")[0]
+        >>> boundary = bf.track_critical_point(solution, lp["label"], imperfection)
+        >>> plt.plot(boundary.raw_data[0]["PAR(2)"], boundary.raw_data[0]["PAR(1)"])
+        """
+        point = solution.point(label)
+        if point_type_name(point["type"]) not in ("LP", "BP"):
+            raise ValueError(
+                f"Point {label} is a {point_type_name(point['type'])} point. "
+                "Only limit points and branch points can be tracked."
+            )
+        if parameter not in self.energy.params:
+            raise KeyError(f"{parameter} is not a parameter of the energy.")
+        index = int(self.energy.params[parameter]["name"][len("PAR(") : -1])
+        constants = {"ISW": 2, "ICP": [1, index]}
+        constants.update(auto_params)
+        return solution.continue_from(label, **constants)
+
     def _fortran_equilibriums(self):
-        equis = self.energy.equilibrium()
-        fort_eqs = []
-        for i, eq in enumerate(equis):
-            fort_eq = f"F({i + 1:d})=" + self._f_printer.doprint(eq).lstrip()
-            fort_eqs.append(fort_eq)
-        return fort_eqs
+        return self._fortran_assignments(self._equilibrium_assignments())
+
+    def _fortran_jacobian(self):
+        """Returns FORTRAN statements for the non-zero entries of ``DFDU``
+        and ``DFDP``."""
+        dfdu, dfdp = self._jacobian_assignments()
+        return self._fortran_assignments(dfdu), self._fortran_assignments(dfdp)
+
+    def _equilibrium_assignments(self):
+        return [(f"F({i + 1:d})", eq) for i, eq in enumerate(self.energy.equilibrium())]
+
+    def _jacobian_assignments(self):
+        dfdu = [
+            (f"DFDU({i + 1:d},{j + 1:d})", entry)
+            for i, row in enumerate(self.energy.hessian())
+            for j, entry in enumerate(row)
+            if entry != 0
+        ]
+        dfdp = [
+            (f"DFDP({i + 1:d},{k + 1:d})", entry)
+            for i, row in enumerate(self.energy.parameter_derivatives())
+            for k, entry in enumerate(row)
+            if entry != 0
+        ]
+        return dfdu, dfdp
+
+    def _fortran_assignments(self, assignments, temporaries=None):
+        """Prints ``(lhs, expr)`` assignments. Names of temporaries holding
+        hoisted sums are appended to ``temporaries``."""
+        printer = _StatementPrinter(self.max_statement_terms)
+        return printer.print_assignments(assignments, temporaries)
+
+    def _fortran_func_body(self):
+        """Returns the names of local variables and the FORTRAN statements
+        of FUNC grouped by ``IJAC`` level, i.e. ``F``, ``DFDU`` and ``DFDP``."""
+        return self._print_func_body(*self._func_assignments())
+
+    def _func_assignments(self):
+        """Symbolic part of :meth:`_fortran_func_body`. Returns the names of
+        local variables and the ``(lhs, expr)`` assignments of FUNC grouped
+        by ``IJAC`` level. The expressions are in terms of plain symbols
+        named after the FORTRAN names of the quantities, so the generated
+        code depends neither on their display names nor on ``processes``."""
+        if self.processes == 1:
+            plain = self.energy._plain_symbols()
+            groups = [self._equilibrium_assignments()]
+            if self.analytic_jacobian:
+                groups.extend(self._jacobian_assignments())
+            groups = [
+                [(lhs, expr.xreplace(plain)) for lhs, expr in group] for group in groups
+            ]
+        else:
+            groups = self._parallel_assignments()
+        local_vars = []
+        if self.cse:
+            groups, local_vars = self._eliminate_common_subexpressions(groups)
+        return local_vars, groups
+
+    def _print_func_body(self, local_vars, groups):
+        """Printing part of :meth:`_fortran_func_body`."""
+        if self.processes != 1:
+            return self._parallel_print(local_vars, groups)
+        temporaries = []
+        statements = [self._fortran_assignments(group, temporaries) for group in groups]
+        return local_vars + temporaries, statements
+
+    def _chunk_size(self, n_jobs):
+        """Jobs per task, so that every process gets about four tasks."""
+        processes = self.processes or os.cpu_count() or 1
+        return max(1, n_jobs // (4 * processes))
+
+    def _parallel_assignments(self):
+        """Same as the assignments of :meth:`_func_assignments` without
+        CSE, but computed per DOF in a process pool. The energy is sent
+        to the workers in terms of plain symbols, which are cheaper to
+        pickle than quantities."""
+        plain = self.energy._plain_symbols()
+        dofs = [plain[dof] for dof in self.energy.dofs]
+        parameters = [
+            plain[qty] for qty in list(self.energy.load) + list(self.energy.params)
+        ]
+        job = partial(
+            _derivatives_job,
+            dofs=dofs,
+            parameters=parameters,
+            jacobian=self.analytic_jacobian,
+        )
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_derivatives_worker,
+            initargs=(self.energy.expr.xreplace(plain), self.energy.backend),
+        ) as pool:
+            rows = list(pool.map(job, dofs, chunksize=self._chunk_size(len(dofs))))
+        groups = [[(f"F({i + 1:d})", eq) for i, (eq, _, _) in enumerate(rows)]]
+        if self.analytic_jacobian:
+            for name, index in [("DFDU", 1), ("DFDP", 2)]:
+                groups.append(
+                    [
+                        (f"{name}({i + 1:d},{j + 1:d})", entry)
+                        for i, row in enumerate(rows)
+                        for j, entry in enumerate(row[index])
+                        if entry != 0
+                    ]
+                )
+        return groups
+
+    def _parallel_print(self, local_vars, groups):
+        """Same as :meth:`_print_func_body`, but printing chunks of the
+        assignments in a process pool. The ``SUM`` temporaries of each
+        chunk are renumbered before the lines are wrapped, so the statements
+        are identical to those printed in a single process."""
+        printer = _StatementPrinter(self.max_statement_terms)
+        chunks = []
+        for index, group in enumerate(groups):
+            size = self._chunk_size(len(group))
+            for start in range(0, len(group), size):
+                chunks.append((index, group[start : start + size]))
+        job = partial(_print_assignments_job, self.max_statement_terms)
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            results = pool.map(job, [chunk for _, chunk in chunks])
+            statements = [[] for _ in groups]
+            n_temporaries = 0
+            for (index, _), (chunk_statements, n_chunk) in zip(chunks, results):
+                if n_chunk:
+                    chunk_statements = _renumber_temporaries(
+                        chunk_statements, n_temporaries
+                    )
+                statements[index].extend(
+                    printer.wrap(stmt) for stmt in chunk_statements
+                )
+                n_temporaries += n_chunk
+        temporaries = [f"SUM{i:d}" for i in range(1, n_temporaries + 1)]
+        return local_vars + temporaries, statements
+
+    def _eliminate_common_subexpressions(self, groups):
+        """Extracts subexpressions shared by all assignments in ``groups``
+        into temporaries. Each temporary is computed in the first group
+        that depends on it, so that the ``DFDU`` and ``DFDP`` temporaries
+        are only evaluated when AUTO-07p asks for the Jacobian.
+        """
+        exprs = [expr for group in groups for _, expr in group]
+        replacements, reduced = cse(exprs, symbols=numbered_symbols("CSE", start=1))
+
+        temp_deps = {}
+        for temp, expr in replacements:
+            deps = {temp}
+            for symbol in expr.free_symbols:
+                deps |= temp_deps.get(symbol, set())
+            temp_deps[temp] = deps
+
+        computed = set()
+        new_groups = []
+        reduced = iter(reduced)
+        for group in groups:
+            group_exprs = [next(reduced) for _ in group]
+            needed = set()
+            for expr in group_exprs:
+                for symbol in expr.free_symbols:
+                    needed |= temp_deps.get(symbol, set())
+            new_group = [
+                (temp.name, expr)
+                for temp, expr in replacements
+                if temp in needed and temp not in computed
+            ]
+            computed |= needed
+            new_group += [(lhs, expr) for (lhs, _), expr in zip(group, group_exprs)]
+            new_groups.append(new_group)
+
+        ops_before = count_ops(exprs)
+        ops_after = count_ops([expr for group in new_groups for _, expr in group])
+        self.cse_report = ParamDict(
+            {
+                "temporaries": len(replacements),
+                "ops_before": ops_before,
+                "ops_after": ops_after,
+                "reduction": f"{1 - ops_after / max(ops_before, 1):.1%}",
+            }
+        )
+        return new_groups, [temp.name for temp, _ in replacements]
 
 
 class BifurcationProblemSolver:
-    def __init__(self, bf_problem):
+    """Generates FORTRAN code for a :class:`pyfurc.core.BifurcationProblem`,
+    compiles it against AUTO-07p and runs the calculation.
+
+    Parameters
+    ----------
+    bf_problem : :class:`pyfurc.core.BifurcationProblem`
+        The problem to solve.
+    cache : :class:`pyfurc.cache.ExecutableCache`, optional
+        If given, compiled executables are looked up in and added to this
+        cache. On a cache hit, compiling and linking are skipped.
+    runtime_start_values : bool, optional
+        If ``True``, the start values of the load, the parameters and the
+        dofs are not written into the FORTRAN source. Instead, ``STPNT``
+        reads them at runtime from the file ``stpnt.{problem_name}``
+        written next to ``c.{problem_name}``. The compiled executable
+        then does not depend on quantity values and can be reused for any
+        number of value sets. Default is ``False``.
+    profile_hooks : list of callable, optional
+        Called with a :class:`pyfurc.profiling.PhaseRecord` whenever a
+        phase of a solve has finished. The complete
+        :class:`pyfurc.profiling.SolveProfile` of a solve is available as
+        ``solution.profile``.
+    store : :class:`pyfurc.storage.SolutionStore`, optional
+        If given, :meth:`solve` and :meth:`solve_async` return the stored
+        solution of an identical problem solved with the same backend (see
+        :meth:`pyfurc.core.BifurcationProblem.fingerprint`) without
+        running AUTO-07p. New solutions are added to the store.
+    work_dir : str, optional
+        Base directory of the solution directories. Defaults to
+        ``$PYFURC_WORK_DIR`` or the current working directory. A tmpfs
+        such as ``/dev/shm`` keeps intermediate files off the disk.
+    retention : str, optional
+        What remains of a solution directory after the results have been
+        read:
+
+        * ``"keep"`` (default): all files.
+        * ``"results"``: only the AUTO-07p output ``fort.7`` and
+          ``fort.8``.
+        * ``"delete"``: nothing. Labeled solutions are read into memory
+          before the directory is deleted.
+    stability : bool, optional
+        If ``True``, the stability of all points of a solution is
+        classified after reading it, see
+        :meth:`pyfurc.core.BifurcationProblem.classify_stability`.
+        Default is ``False``.
+    backend : str, optional
+        ``"auto07p"`` (default) generates, compiles and runs FORTRAN code.
+        ``"numpy"`` solves the problem with
+        :class:`pyfurc.continuation.NumpyContinuation` instead, which
+        avoids the compiler and AUTO-07p altogether and is much faster
+        for problems with a few DOFs. It only supports continuations in
+        the load ``PAR(1)`` and no :meth:`iter_solve` or
+        :meth:`continue_from`.
+    timeouts : dict, optional
+        Maximum durations in seconds of the phases ``"compile"``,
+        ``"link"`` and ``"run"``. A compiler or linker that takes longer
+        is killed and ``TimeoutError`` is raised. An AUTO-07p run that
+        takes longer is killed and the points computed so far are
+        returned as partial solution, see ``status`` of
+        :class:`pyfurc.core.BifurcationProblemSolution`.
+    cpu_time : float, optional
+        CPU time limit of the AUTO-07p run in seconds. If it is exceeded,
+        the run is killed and a partial solution is returned.
+    memory : int, optional
+        Address space limit of the AUTO-07p run in bytes. If AUTO-07p
+        runs out of memory, a partial solution is returned.
+
+    If any limit of the AUTO-07p run is set, gfortran writes ``fort.7``
+    unbuffered, so that all points computed before the run is stopped are
+    contained in the partial solution.
+    """
+
+    _f_printer = _LazyCodePrinter()
+
+    max_routine_size = 50000
+    """FUNC bodies with more characters are split into helper subroutines
+    of about this size, which keeps compile times of large problems
+    roughly linear in their size."""
+    func_module = "PYFURC_FUNC"
+    _func_arrays = (("F", "NDIM"), ("DFDU", "NDIM,NDIM"), ("DFDP", "NDIM,*"))
+
+    retention_policies = ("keep", "results", "delete")
+    solver_backends = ("auto07p", "numpy")
+    timeout_phases = ("compile", "link", "run")
+    result_files = ("fort.7", "fort.8")
+
+    def __init__(
+        self,
+        bf_problem,
+        cache=None,
+        runtime_start_values=False,
+        profile_hooks=None,
+        work_dir=None,
+        retention="keep",
+        store=None,
+        stability=False,
+        backend="auto07p",
+        timeouts=None,
+        cpu_time=None,
+        memory=None,
+    ):
+        if retention not in self.retention_policies:
+            raise ValueError(
+                f"Unknown retention policy {retention!r}, expected one of "
+                + ", ".join(self.retention_policies)
+            )
+        if backend not in self.solver_backends:
+            raise ValueError(
+                f"Unknown solver backend {backend!r}, expected one of "
+                + ", ".join(self.solver_backends)
+            )
+        timeouts = dict(timeouts or {})
+        for phase in timeouts:
+            if phase not in self.timeout_phases:
+                raise ValueError(
+                    f"Unknown phase {phase!r}, expected one of "
+                    + ", ".join(self.timeout_phases)
+                )
         self.problem = bf_problem
-        self._f_printer = AutoCodePrinter()
+        self.cache = cache
+        self.runtime_start_values = runtime_start_values
+        self.profile_hooks = list(profile_hooks) if profile_hooks is not None else []
+        self.work_dir = work_dir
+        self.retention = retention
+        self.store = store
+        self.stability = stability
+        self.backend = backend
+        self.timeouts = timeouts
+        self.cpu_time = cpu_time
+        self.memory = memory
+        self._process = None
+        self._cancelled = False
+        self.compile_flags = ["-O"]
+        self.link_flags = ["-O"]
         self._f_ind = "  "
 
-    def _f_func(self):
-        eq_exprs = self.problem._fortran_equilibriums()
-
-        code = "SUBROUTINE FUNC(NDIM,U,ICP,PAR,IJAC,F,DFDU,DFDP)\n\n"
-        code += self._f_ind + "IMPLICIT NONE\n"
-        code += self._f_ind + "INTEGER, INTENT(IN) :: NDIM, IJAC, ICP(*)\n"
-        code += self._f_ind + "DOUBLE PRECISION, INTENT(IN) :: U(NDIM), PAR(*)\n"
-        code += self._f_ind + "DOUBLE PRECISION, INTENT(OUT) :: F(NDIM)\n"
-        code += (
+    def _f_func(self, body=None):
+        return "".join(self._iter_f_func(body))
+
+    def _iter_f_func(self, body=None):
+        """Yields the code of FUNC piece by piece. If the statements of the
+        body exceed ``max_routine_size`` characters, they are moved into
+        helper subroutines of a module preceding FUNC, which FUNC calls."""
+        if body is None:
+            body = self.problem._fortran_func_body()
+        local_vars, groups = body
+        use_module = (
+            sum(len(stmt) for group in groups for stmt in group) > self.max_routine_size
+        )
+        if use_module:
+            chunks = [self._split_statements(group) for group in groups]
+            yield from self._iter_f_func_module(local_vars, chunks)
+            groups = [
+                [
+                    f"CALL {self._helper_name(i, j)}(NDIM,U,PAR,{self._func_arrays[i][0]})"
+                    for j in range(len(group_chunks))
+                ]
+                for i, group_chunks in enumerate(chunks)
+            ]
+            local_vars = []
+        eq_exprs, *jac_exprs = groups
+
+        yield "SUBROUTINE FUNC(NDIM,U,ICP,PAR,IJAC,F,DFDU,DFDP)\n\n"
+        if use_module:
+            yield self._f_ind + f"USE {self.func_module}\n"
+        yield self._f_ind + "IMPLICIT NONE\n"
+        yield self._f_ind + "INTEGER, INTENT(IN) :: NDIM, IJAC, ICP(*)\n"
+        yield self._f_ind + "DOUBLE PRECISION, INTENT(IN) :: U(NDIM), PAR(*)\n"
+        yield self._f_ind + "DOUBLE PRECISION, INTENT(OUT) :: F(NDIM)\n"
+        yield (
             self._f_ind
-            + "DOUBLE PRECISION, INTENT(INOUT) :: DFDU(NDIM,NDIM),DFDP(NDIM,*)\n\n"
+            + "DOUBLE PRECISION, INTENT(INOUT) :: DFDU(NDIM,NDIM),DFDP(NDIM,*)\n"
         )
+        yield from self._iter_declarations(local_vars)
+        yield "\n"
         # body
         for expr in eq_exprs:
-            code += self._f_ind + expr + "\n"
+            yield self._f_ind + expr + "\n"
+        if self.problem.analytic_jacobian:
+            dfdu_exprs, dfdp_exprs = jac_exprs
+            npar = self.problem._other_parameters["NPAR"]
+            yield "\n" + self._f_ind + "IF (IJAC.EQ.0) RETURN\n\n"
+            yield self._f_ind + "DFDU(1:NDIM,1:NDIM)=0.0d0\n"
+            for expr in dfdu_exprs:
+                yield self._f_ind + expr + "\n"
+            yield "\n" + self._f_ind + "IF (IJAC.EQ.1) RETURN\n\n"
+            yield self._f_ind + f"DFDP(1:NDIM,1:{npar:d})=0.0d0\n"
+            for expr in dfdp_exprs:
+                yield self._f_ind + expr + "\n"
         # end body
-        code += "\nEND SUBROUTINE FUNC"
-        return code
+        yield "\nEND SUBROUTINE FUNC"
+
+    def _iter_declarations(self, local_vars):
+        for i in range(0, len(local_vars), 8):
+            yield (
+                self._f_ind
+                + "DOUBLE PRECISION :: "
+                + ", ".join(local_vars[i : i + 8])
+                + "\n"
+            )
+
+    def _split_statements(self, statements):
+        """Splits ``statements`` into chunks of about ``max_routine_size``
+        characters."""
+        chunks = []
+        size = self.max_routine_size
+        for statement in statements:
+            if size >= self.max_routine_size:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(statement)
+            size += len(statement)
+        return chunks
+
+    def _helper_name(self, group, chunk):
+        return f"FUNC_{self._func_arrays[group][0]}{chunk + 1:d}"
+
+    def _iter_f_func_module(self, local_vars, chunks):
+        yield f"MODULE {self.func_module}\n\n"
+        yield self._f_ind + "IMPLICIT NONE\n"
+        yield from self._iter_declarations(local_vars)
+        yield "\nCONTAINS\n\n"
+        for i, group_chunks in enumerate(chunks):
+            array, shape = self._func_arrays[i]
+            for j, statements in enumerate(group_chunks):
+                name = self._helper_name(i, j)
+                yield f"SUBROUTINE {name}(NDIM,U,PAR,{array})\n\n"
+                yield self._f_ind + "INTEGER, INTENT(IN) :: NDIM\n"
+                yield self._f_ind + "DOUBLE PRECISION, INTENT(IN) :: U(NDIM), PAR(*)\n"
+                yield self._f_ind + f"DOUBLE PRECISION, INTENT(INOUT) :: {array}({shape})\n\n"
+                for statement in statements:
+                    yield self._f_ind + statement + "\n"
+                yield f"\nEND SUBROUTINE {name}\n\n"
+        yield f"END MODULE {self.func_module}\n\n"
 
     def _f_stpnt(self):
+        if self.runtime_start_values:
+            return self._f_stpnt_runtime()
         code = "SUBROUTINE STPNT(NDIM,U,PAR,T)\n\n"
         code += self._f_ind + "IMPLICIT NONE\n"
         code += self._f_ind + "INTEGER, INTENT(IN) :: NDIM\n"
@@ -408,6 +1561,34 @@ class BifurcationProblemSolver:
         code += "\nEND SUBROUTINE STPNT"
         return code
 
+    def _f_stpnt_runtime(self):
+        npar = self.problem._other_parameters["NPAR"]
+        code = "SUBROUTINE STPNT(NDIM,U,PAR,T)\n\n"
+        code += self._f_ind + "IMPLICIT NONE\n"
+        code += self._f_ind + "INTEGER, INTENT(IN) :: NDIM\n"
+        code += self._f_ind + "DOUBLE PRECISION, INTENT(INOUT) :: U(NDIM),PAR(*)\n"
+        code += self._f_ind + "DOUBLE PRECISION, INTENT(IN) :: T\n"
+        code += self._f_ind + "CHARACTER(LEN=4096) :: FNAME\n"
+        code += self._f_ind + "INTEGER :: FUNIT, FSTAT\n\n"
+        # body
+        code += (
+            self._f_ind
+            + f"CALL GET_ENVIRONMENT_VARIABLE('{STPNT_ENV_VAR:s}', FNAME, STATUS=FSTAT)\n"
+        )
+        code += self._f_ind + "IF (FSTAT.NE.0) THEN\n"
+        code += self._f_ind * 2 + f"STOP '{STPNT_ENV_VAR:s} is not set'\n"
+        code += self._f_ind + "END IF\n"
+        code += (
+            self._f_ind
+            + "OPEN(NEWUNIT=FUNIT, FILE=TRIM(FNAME), STATUS='OLD', ACTION='READ')\n"
+        )
+        code += self._f_ind + f"READ(FUNIT,*) PAR(1:{npar:d})\n"
+        code += self._f_ind + "READ(FUNIT,*) U(1:NDIM)\n"
+        code += self._f_ind + "CLOSE(FUNIT)\n"
+        # end body
+        code += "\nEND SUBROUTINE STPNT"
+        return code
+
     def _f_bcnd(self):
         code = "SUBROUTINE BCND(NDIM,PAR,ICP,NBC,U0,U1,FB,IJAC,DBC)\n\n"
         code += self._f_ind + "IMPLICIT NONE\n"
@@ -455,24 +1636,70 @@ class BifurcationProblemSolver:
         code += "END SUBROUTINE PVLS"
         return code
 
-    def write_func_file(self, basedir="./", silent=False):
+    def fortran_source(self, func=None):
+        """Returns the complete FORTRAN source of the problem.
+
+        Parameters
+        ----------
+        func : str, optional
+            Previously generated code of the ``FUNC`` subroutine. It does
+            not depend on quantity values and may be reused when only
+            values change. Generated if not given.
+        """
+        return "".join(self._iter_fortran_source(func=func))
+
+    def _iter_fortran_source(self, func=None, body=None):
+        if func is not None:
+            yield func
+        else:
+            yield from self._iter_f_func(body)
+        for subroutine in [
+            self._f_stpnt,
+            self._f_bcnd,
+            self._f_icnd,
+            self._f_fopt,
+            self._f_pvls,
+        ]:
+            yield "\n\n"
+            yield subroutine()
+
+    def write_func_file(self, basedir="./", silent=False, source=None, body=None):
+        """Writes the FORTRAN source to ``{problem_name}.f90``. Unless the
+        complete ``source`` is given, it is written piece by piece as it is
+        assembled, optionally from a previously printed FUNC ``body``."""
         fname = os.path.join(basedir, self.problem.problem_name + ".f90")
-        code = self._f_func() + "\n\n"
-        code += self._f_stpnt() + "\n\n"
-        code += self._f_bcnd() + "\n\n"
-        code += self._f_icnd() + "\n\n"
-        code += self._f_fopt() + "\n\n"
-        code += self._f_pvls()
         with open(fname, "w") as outfile:
-            outfile.write(code)
+            if source is not None:
+                outfile.write(source)
+            else:
+                outfile.writelines(self._iter_fortran_source(body=body))
         if not silent:
             print(f"File {fname:s} written.")
 
-    def write_const_file(self, basedir="./", silent=False):
+    def write_stpnt_file(self, basedir="./", silent=False):
+        """Writes the start values of the load, the parameters and the dofs
+        to ``stpnt.{problem_name}``, which is read at runtime if
+        ``runtime_start_values`` is set."""
+        fname = os.path.join(basedir, "stpnt." + self.problem.problem_name)
+        energy = self.problem.energy
+        par_values = [info["value"] for info in energy.load.values()]
+        par_values += [info["value"] for info in energy.params.values()]
+        dof_values = [info["value"] for info in energy.dofs.values()]
+        with open(fname, "w") as outfile:
+            for values in [par_values, dof_values]:
+                outfile.write(" ".join(repr(float(val)) for val in values) + "\n")
+
+        if not silent:
+            print(f"File {fname:s} written.")
+
+    def write_const_file(self, basedir="./", silent=False, constants=None):
+        """Writes the AUTO-07p constants to ``c.{problem_name}``. Values in
+        ``constants`` take precedence over those of the problem."""
         fname = os.path.join(basedir, "c." + self.problem.problem_name)
         params = {}
         params.update(self.problem.problem_parameters)
         params.update(self.problem._other_parameters)
+        params.update(constants or {})
         with open(fname, "w") as outfile:
             for name, val in params.items():
                 outstr = name + "\t=\t" + str(val) + "\n"
@@ -482,88 +1709,627 @@ class BifurcationProblemSolver:
             print(f"File {fname:s} written.")
 
     def solve(self):
-        ddir = DataDir(name=self.problem.problem_name)
-        ddir.create_dir()
-        dirc = str(ddir)
-        self.solution_dir = dirc
-        self.write_func_file(basedir=dirc, silent=True)
-        self.write_const_file(basedir=dirc, silent=True)
-        self.run_auto(dirc)
+        self._cancelled = False
+        profile = self._new_profile()
+        fingerprint, solution = self._stored_solution(profile)
+        if solution is not None:
+            return solution
+        if self.backend == "numpy":
+            solution = self._solve_numpy(profile)
+        else:
+            dirc = self._prepare_solution_dir(profile)
+            status = self.run_auto(dirc, profile)
+            solution = self._read_solution(dirc, profile, status)
+        self._store_solution(fingerprint, solution, profile)
+        return solution
+
+    def _stored_solution(self, profile):
+        """Looks the problem up in ``store``. Returns its fingerprint and
+        the stored solution or ``None``."""
+        if self.store is None:
+            return None, None
+        with profile.phase("store"):
+            fingerprint = self.problem.fingerprint(backend=self.backend)
+            fname = self.store.lookup(fingerprint)
+            if fname is None:
+                return fingerprint, None
+            solution = BifurcationProblemSolution.load(fname)
+        print(f"Using stored solution for problem {self.problem.problem_name}")
+        # the stored solution may come from a solver without stability
+        if self.stability and any("STABLE" not in table for table in solution.raw_data):
+            with profile.phase("stability"):
+                self.problem.classify_stability(solution)
+        solution.profile = profile
+        solution.metadata = self.problem.metadata()
+        solution.solver = self
         self.problem._solved = True
-        self.problem.solution = BifurcationProblemSolution()
-        self.problem.solution.read_solution(dirc)
+        self.problem.solution = solution
+        return fingerprint, solution
+
+    def _store_solution(self, fingerprint, solution, profile):
+        # partial solutions of stopped runs are not reused
+        if self.store is not None and solution.status == "complete":
+            with profile.phase("store"):
+                self.store.add(fingerprint, solution)
+
+    async def solve_async(self, semaphore=None, on_output=None):
+        """Coroutine version of :meth:`solve`.
 
-    def run_auto(self, dirc):
+        Compiler, linker and AUTO-07p run as asyncio subprocesses, so a
+        single event loop can drive many solves concurrently. Code
+        generation and reading the results run in the default executor.
+
+        Parameters
+        ----------
+        semaphore : asyncio.Semaphore, optional
+            Bounds the number of concurrently running subprocesses when
+            shared between solves.
+        on_output : callable, optional
+            Called with every line of compiler and AUTO-07p output as soon
+            as it is written. By default the output is printed.
+
+        Returns
+        -------
+        :class:`pyfurc.core.BifurcationProblemSolution`
+
+        Example
+        -------
+        >>> semaphore = asyncio.Semaphore(4)
+        >>> solvers = [pf.BifurcationProblemSolver(bf) for bf in problems]
+        >>> solutions = await asyncio.gather(
+        ...     *(solver.solve_async(semaphore) for solver in solvers)
+        ... )
+        """
+        if on_output is None:
+            on_output = partial(print, end="")
+        loop = asyncio.get_running_loop()
         p_name = self.problem.problem_name
-        print(f"Compiling FORTRAN source for problem {p_name}")
         env = setup_auto_exec_env()
-        auto_lib_dir = env["LD_LIBRARY_PATH"]
-        compile_cmd = [
-            "gfortran",
-            "-O",
-            "-c",
-            f"{p_name}.f90",
-            "-o",
-            f"{p_name}.o",
-        ]
-        print(" ".join(compile_cmd))
-
-        # ["@r", self.problem.problem_name]
-        try:
-            compile_process = Popen(
-                compile_cmd,
-                stderr=PIPE,
-                stdout=PIPE,
-                cwd=dirc,
-            )
-            out, err = compile_process.communicate()
-        except FileNotFoundError:
-            # This should mean gfortran is not installed
-            raise OSError(
-                "Something went wrong when calling the "
-                "Fortran compiler. Maybe gfortran is not installed?"
+        profile = self._new_profile()
+        fingerprint, solution = await loop.run_in_executor(
+            None, self._stored_solution, profile
+        )
+        if solution is not None:
+            return solution
+        if self.backend == "numpy":
+            solution = await loop.run_in_executor(None, self._solve_numpy, profile)
+            await loop.run_in_executor(
+                None, self._store_solution, fingerprint, solution, profile
             )
+            return solution
+        dirc = await loop.run_in_executor(None, self._prepare_solution_dir, profile)
+        await build_auto_executable_async(
+            dirc,
+            p_name,
+            env,
+            compile_flags=self.compile_flags,
+            link_flags=self.link_flags,
+            cache=self.cache,
+            semaphore=semaphore,
+            on_output=on_output,
+            profile=profile,
+            timeouts=self.timeouts,
+        )
+        try:
+            with profile.phase("run"):
+                returncode, _ = await run_auto_executable_async(
+                    dirc,
+                    p_name,
+                    self._run_env(env),
+                    semaphore=semaphore,
+                    on_output=on_output,
+                    timeout=self.timeouts.get("run"),
+                    cpu_time=self.cpu_time,
+                    memory=self.memory,
+                )
+            status = run_status(returncode)
+        except TimeoutError:
+            status = "timeout"
+        solution = await loop.run_in_executor(
+            None, self._read_solution, dirc, profile, status
+        )
+        await loop.run_in_executor(
+            None, self._store_solution, fingerprint, solution, profile
+        )
+        return solution
 
-        print(f"Linking...")
-        link_cmd = [
-            "gfortran",
-            f"-L{auto_lib_dir}",
-            "-O",
-            f"{p_name}.o",
-            "-lauto",
-            "-o",
-            f"{p_name}.out",
-        ]
-        print(" ".join(link_cmd))
+    def iter_solve(self, poll_interval=0.05):
+        """Solves the problem while yielding the continuation points as
+        soon as AUTO-07p writes them to ``fort.7``.
 
-        link_process = Popen(link_cmd, cwd=dirc, stderr=PIPE, stdout=PIPE, env=env)
+        AUTO-07p output is written to ``{problem_name}.log`` in the
+        solution directory. When the generator is exhausted, the complete
+        solution is available in ``problem.solution``.
 
-        out, err = link_process.communicate()
-        print(f"Running executable {p_name}")
-        parameters = open(os.path.join(dirc, f"c.{p_name}"))
-        run_cmd = [f"./{p_name}.out"]
-        run_process = Popen(
-            run_cmd,
-            cwd=dirc,
-            stderr=PIPE,
-            stdout=PIPE,
-            stdin=parameters,
-            env=env,
-            universal_newlines=True,
+        The run can be cancelled from inside the loop with ``break`` or
+        by calling :meth:`cancel`. The AUTO-07p process is then killed
+        and ``problem.solution`` holds the points computed so far. The
+        same happens when a limit of the run is exceeded, see
+        ``timeouts``, ``cpu_time`` and ``memory``.
+
+        Parameters
+        ----------
+        poll_interval : float, optional
+            Seconds to wait between checks for new output.
+
+        Yields
+        ------
+        :class:`pyfurc.util.ContinuationPoint`
+
+        Example
+        -------
+        >>> for point in solver.iter_solve():
+        ...     print(point.branch, point.type, point.par, point.u)
+        ...     if abs(point.u[0]) > 1.5:
+        ...         break
+        """
+        if self.backend == "numpy":
+            raise NotImplementedError(
+                "iter_solve is not supported by the NumPy backend."
+            )
+        self._cancelled = False
+        p_name = self.problem.problem_name
+        profile = self._new_profile()
+        dirc = self._prepare_solution_dir(profile)
+        self._build(dirc, profile)
+        if self._cancelled:
+            self._read_solution(dirc, profile, "cancelled")
+            return
+        # make gfortran write fort.7 line by line
+        env = dict(setup_auto_exec_env(), GFORTRAN_UNBUFFERED_ALL="y")
+        fort7 = os.path.join(dirc, "fort.7")
+        parser = Fort7Parser()
+        timed_out = False
+        timeout = self.timeouts.get("run")
+        with open(os.path.join(dirc, f"{p_name}.log"), "w") as log:
+            process = start_auto_executable(
+                dirc,
+                p_name,
+                env,
+                stdout=log,
+                stderr=log,
+                cpu_time=self.cpu_time,
+                memory=self.memory,
+            )
+            self._track_process(process)
+            start = time.monotonic()
+            try:
+                with profile.phase("run"):
+                    partial_line = ""
+                    position = 0
+                    while not self._cancelled:
+                        finished = process.poll() is not None
+                        if (
+                            not finished
+                            and timeout is not None
+                            and time.monotonic() - start > timeout
+                        ):
+                            kill_process_group(process)
+                            timed_out = finished = True
+                        if os.path.isfile(fort7):
+                            with open(fort7) as outfile:
+                                outfile.seek(position)
+                                data = partial_line + outfile.read()
+                                position = outfile.tell()
+                            *lines, partial_line = data.split("\n")
+                            for line in lines:
+                                row = parser.feed(line)
+                                if row is not None:
+                                    yield parser.point(row)
+                                    if self._cancelled:
+                                        break
+                        if finished:
+                            break
+                        time.sleep(poll_interval)
+            finally:
+                killed = process.poll() is None
+                if killed:
+                    kill_process_group(process)
+                self._process = None
+                status = run_status(
+                    process.returncode, timed_out, self._cancelled or killed
+                )
+                if os.path.isfile(fort7):
+                    self._read_solution(dirc, profile, status)
+
+    def cancel(self):
+        """Stops a running :meth:`solve`, :meth:`iter_solve` or
+        :meth:`continue_from`, e.g. from another thread. The process group
+        of the compiler, linker or AUTO-07p is killed and the solve
+        returns the points computed so far. If AUTO-07p has not been
+        started yet, it is not started at all."""
+        self._cancelled = True
+        process = self._process
+        if process is not None and process.poll() is None:
+            kill_process_group(process)
+
+    def _track_process(self, process):
+        """Makes ``process`` the one killed by :meth:`cancel`. Kills it
+        right away if the solve has already been cancelled."""
+        self._process = process
+        if self._cancelled and process.poll() is None:
+            kill_process_group(process)
+
+    def _new_profile(self):
+        return SolveProfile(hooks=self.profile_hooks)
+
+    def _prepare_solution_dir(self, profile, write_source=True, constants=None):
+        p_name = self.problem.problem_name
+        body = None
+        if write_source:
+            with profile.phase("differentiate"):
+                local_vars, groups = self.problem._func_assignments()
+            with profile.phase("print"):
+                body = self.problem._print_func_body(local_vars, groups)
+        with profile.phase("write"):
+            ddir = DataDir(base_dir=self.work_dir, name=p_name)
+            ddir.create_dir()
+            dirc = str(ddir)
+            self.solution_dir = dirc
+            if write_source:
+                self.write_func_file(basedir=dirc, silent=True, body=body)
+            self.write_const_file(basedir=dirc, silent=True, constants=constants)
+            if self.runtime_start_values:
+                self.write_stpnt_file(basedir=dirc, silent=True)
+        if write_source:
+            profile.record_file_size(os.path.join(dirc, f"{p_name}.f90"), key="source")
+        return dirc
+
+    def _read_solution(self, dirc, profile=None, status="complete"):
+        if profile is None:
+            profile = self._new_profile()
+        if status != "complete":
+            warn(
+                f"The AUTO-07p run of problem {self.problem.problem_name} "
+                f"ended with status {status!r}, the solution is partial.",
+                RuntimeWarning,
+            )
+            for fname in self.result_files:
+                # the run may have been stopped before writing any output
+                open(os.path.join(dirc, fname), "a").close()
+        with profile.phase("parse"):
+            solution = BifurcationProblemSolution()
+            solution.read_solution(dirc)
+        for fname in ["fort.7", "fort.8", "fort.9"]:
+            profile.record_file_size(os.path.join(dirc, fname))
+        self._finish_solution(solution, profile, status)
+        self._apply_retention(dirc, solution)
+        return solution
+
+    def _solve_numpy(self, profile):
+        p_name = self.problem.problem_name
+        with profile.phase("lambdify"):
+            continuation = NumpyContinuation(self.problem)
+        print(f"Running NumPy continuation of problem {p_name}")
+        with profile.phase("run"):
+            tables, solutions = continuation.run()
+        solution = BifurcationProblemSolution()
+        solution.raw_data = tables
+        solution.labeled_points = labeled_points(tables)
+        solution.fort8 = solutions
+        solution._build_index()
+        return self._finish_solution(solution, profile)
+
+    def _finish_solution(self, solution, profile, status="complete"):
+        """Classifies the stability if requested and attaches profile,
+        metadata, solver and status to a new solution of the problem."""
+        if self.stability:
+            with profile.phase("stability"):
+                self.problem.classify_stability(solution)
+        profile.counters["branches"] = len(solution.raw_data)
+        profile.counters["steps"] = sum(table.n_rows for table in solution.raw_data)
+        solution.profile = profile
+        solution.metadata = self.problem.metadata()
+        solution.solver = self
+        solution.status = status
+        self.problem._solved = True
+        self.problem.solution = solution
+        return solution
+
+    def _apply_retention(self, dirc, solution):
+        if self.retention == "delete":
+            # a stopped run may not have written fort.8
+            if os.path.isfile(solution.fort8.fname):
+                solution.fort8.load()
+            shutil.rmtree(dirc)
+            solution.directory = None
+        elif self.retention == "results":
+            for fname in os.listdir(dirc):
+                path = os.path.join(dirc, fname)
+                if fname not in self.result_files and os.path.isfile(path):
+                    os.remove(path)
+
+    def run_auto(self, dirc, profile=None):
+        """Builds and runs the executable in ``dirc``. Returns the status
+        of the run, one of :data:`pyfurc.tools.RUN_STATUSES`."""
+        if profile is None:
+            profile = self._new_profile()
+        self._build(dirc, profile)
+        return self._run(dirc, profile)
+
+    def _build(self, dirc, profile):
+        if self._cancelled:
+            return
+        build_auto_executable(
+            dirc,
+            self.problem.problem_name,
+            setup_auto_exec_env(),
+            compile_flags=self.compile_flags,
+            link_flags=self.link_flags,
+            cache=self.cache,
+            profile=profile,
+            timeouts=self.timeouts,
+            on_process=self._track_process,
         )
+        self._process = None
+
+    def _run_env(self, env):
+        if (
+            self.cpu_time is not None
+            or self.memory is not None
+            or self.timeouts.get("run")
+        ):
+            # keep all points in fort.7 if the run is killed
+            env = dict(env, GFORTRAN_UNBUFFERED_ALL="y")
+        return env
+
+    def _run(self, dirc, profile):
+        """Runs the executable with its output written to
+        ``{problem_name}.log`` and returns the status of the run."""
+        if self._cancelled:
+            return "cancelled"
+        p_name = self.problem.problem_name
+        print(f"Running executable {p_name}")
+        log_name = os.path.join(dirc, f"{p_name}.log")
+        with profile.phase("run"):
+            with open(log_name, "w") as log:
+                process = start_auto_executable(
+                    dirc,
+                    p_name,
+                    self._run_env(setup_auto_exec_env()),
+                    stdout=log,
+                    stderr=log,
+                    cpu_time=self.cpu_time,
+                    memory=self.memory,
+                )
+                self._track_process(process)
+                try:
+                    returncode, timed_out = wait_auto_executable(
+                        process, self.timeouts.get("run")
+                    )
+                finally:
+                    self._process = None
+                    # e.g. on KeyboardInterrupt, which does not reach the
+                    # process group of AUTO-07p
+                    if process.poll() is None:
+                        kill_process_group(process)
+        with open(log_name) as log:
+            shutil.copyfileobj(log, sys.stdout)
+        return run_status(returncode, timed_out, self._cancelled)
+
+    def continue_from(self, solution, label, **auto_params):
+        """Starts a new continuation from the labeled point ``label`` of
+        ``solution``, see
+        :meth:`pyfurc.core.BifurcationProblemSolution.continue_from`."""
+        self._cancelled = False
+        if not isinstance(solution.fort8, Fort8Reader):
+            raise ValueError(
+                "Restarting requires the fort.8 data of the solution, "
+                "which is not contained in saved solutions and solutions "
+                "of the NumPy backend."
+            )
+        point = solution.point(label)
+        constants = {"IRS": label}
+        constants["ISW"] = -1 if point_type_name(point["type"]) == "BP" else 1
+        constants.update(auto_params)
 
-        out, err = run_process.communicate()
-        print(out)
-        print(err)
+        p_name = self.problem.problem_name
+        profile = self._new_profile()
+        executable = None
+        if solution.directory is not None:
+            executable = os.path.join(solution.directory, f"{p_name}.out")
+        reuse = executable is not None and os.path.isfile(executable)
+        dirc = self._prepare_solution_dir(
+            profile, write_source=not reuse, constants=constants
+        )
+        with profile.phase("write"):
+            solution.fort8.copy_to(os.path.join(dirc, "fort.3"))
+        if reuse:
+            with profile.phase("reuse"):
+                target = os.path.join(dirc, f"{p_name}.out")
+                try:
+                    os.link(executable, target)
+                except OSError:
+                    shutil.copy2(executable, target)
+        else:
+            self._build(dirc, profile)
+        status = self._run(dirc, profile)
+
+        child = self._read_solution(dirc, profile, status)
+        child.parent = solution
+        child.metadata["restart"] = dict(constants)
+        solution.children.append(child)
+        return child
 
     def delete_last_solution(self):
-        shutil.rmtree(self.solution_dir)
+        if os.path.isdir(self.solution_dir):
+            shutil.rmtree(self.solution_dir)
 
 
 class BifurcationProblemSolution:
+    """Results of an AUTO-07p calculation.
+
+    Variables
+    ---------
+    :ivar list raw_data: One :class:`pyfurc.util.AutoTable` per table in
+        ``fort.7``, mapping column names to NumPy arrays.
+    :ivar pyfurc.util.Fort8Reader fort8: Lazy reader for the labeled
+        solutions in ``fort.8``.
+    :ivar list labeled_points: Label, point type, branch and position in
+        ``raw_data`` of every labeled point.
+    :ivar pyfurc.util.PointIndex index: Index of the labeled points by
+        label, point type and branch and the graph of the branches, see
+        :meth:`points` and :attr:`branch_graph`.
+    :ivar dict metadata: Description of the solved problem, see
+        :meth:`pyfurc.core.BifurcationProblem.metadata`.
+    :ivar pyfurc.profiling.SolveProfile profile: Timings of the solve
+        that produced the solution, ``None`` for loaded solutions.
+    :ivar str directory: Directory holding the AUTO-07p output, ``None``
+        for loaded solutions.
+    :ivar pyfurc.core.BifurcationProblemSolution parent: The solution this
+        one was continued from, see :meth:`continue_from`.
+    :ivar list children: Solutions continued from this one.
+    :ivar str status: ``"complete"`` or, if the AUTO-07p run was stopped
+        early, the reason, see :data:`pyfurc.tools.RUN_STATUSES`. The
+        solution then contains the points computed so far.
+
+    Labeled solutions are accessed by label, e.g. ``solution[2]`` is the
+    state vector ``U`` of the solution with label 2. Labeled points are
+    queried with :meth:`points`, e.g. ``solution.points(type="BP")``.
+    """
+
     def __init__(self):
-        pass
+        self.metadata = {}
+        self.profile = None
+        self.directory = None
+        self.solver = None
+        self.parent = None
+        self.children = []
+        self.status = "complete"
 
     def read_solution(self, dirc):
+        self.directory = dirc
         self.reader = AutoOutputReader(dirc)
         self.raw_data = self.reader.read_raw_data()
+        self.labeled_points = labeled_points(self.raw_data)
+        self.fort8 = Fort8Reader(os.path.join(dirc, "fort.8"))
+        self._build_index()
+
+    def _build_index(self):
+        self.index = PointIndex(self.raw_data, self.labeled_points)
+
+    def save(self, fname):
+        """Saves the solution to a compact binary file.
+
+        Branch tables, labeled state vectors and the problem metadata are
+        stored in a columnar layout, see
+        :func:`pyfurc.storage.write_solution_file`.
+
+        Parameters
+        ----------
+        fname : str
+            Output file name, e.g. ``"hinged_cantilever.pfs"``.
+        """
+        write_solution_file(fname, self.raw_data, self.metadata, fort8=self.fort8)
+
+    @classmethod
+    def load(cls, fname, mmap=True):
+        """Loads a solution saved with :meth:`save`.
+
+        Parameters
+        ----------
+        fname : str
+            Solution file name.
+        mmap : bool, optional
+            If ``True`` (default), the arrays are memory mapped instead of
+            being read into memory.
+        """
+        tables, solutions, metadata, points = read_solution_file(fname, mmap=mmap)
+        solution = cls()
+        solution.raw_data = tables
+        solution.fort8 = solutions
+        solution.metadata = metadata
+        solution.labeled_points = points
+        solution._build_index()
+        return solution
+
+    def __getitem__(self, label):
+        return self.fort8.record(label)["U"]
+
+    def continue_from(self, label, **auto_params):
+        """Starts a new continuation from a labeled point of this solution.
+
+        AUTO-07p is restarted from the point with label ``label`` (``IRS``)
+        in a new solution directory, so only the new segment is computed.
+        The executable of this solution is reused if it still exists. At
+        branch points (BP) the branch is switched (``ISW=-1``), otherwise
+        the continuation is restarted on the same branch (``ISW=1``).
+
+        Parameters
+        ----------
+        label : int
+            Label of the start point, see ``labeled_points``.
+        **auto_params
+            AUTO-07p constants for the new continuation, e.g. ``ISW``,
+            ``ICP``, ``DS`` or ``NMX``. They take precedence over the
+            constants of the problem.
+
+        Returns
+        -------
+        :class:`pyfurc.core.BifurcationProblemSolution`
+            The new solution. Its ``parent`` is this solution.
+
+        Example
+        -------
+        >>> solution = solver.solve()
+        >>> bp = solution.points(type="BP")[0]
+        >>> branch = solution.continue_from(bp["label"], DS=-0.05, NMX=50)
+        """
+        if self.solver is None:
+            raise ValueError(
+                "Only solutions computed by a BifurcationProblemSolver "
+                "can be continued."
+            )
+        return self.solver.continue_from(self, label, **auto_params)
+
+    def labels(self):
+        """Returns the labels of all solutions stored in ``fort.8``."""
+        return self.fort8.labels()
+
+    def point(self, label):
+        """Returns the labeled point with label ``label``, a dictionary
+        like the entries of ``labeled_points``."""
+        return self.index.point(label)
+
+    def points(self, type=None, branch=None):
+        """Returns the labeled points, optionally only those of a point
+        type and on a branch.
+
+        Parameters
+        ----------
+        type : str or int, optional
+            Point type name, e.g. ``"BP"``, ``"LP"``, ``"UZ"`` or ``"EP"``,
+            or AUTO-07p point type code, see :data:`pyfurc.util.POINT_TYPES`.
+        branch : int, optional
+            Branch number.
+
+        Returns
+        -------
+        list of dict
+            Entries of ``labeled_points``.
+
+        Example
+        -------
+        >>> for bp in solution.points(type="BP", branch=1):
+        ...     print(bp["label"], solution[bp["label"]])
+        """
+        return self.index.points(type=type, branch=branch)
+
+    @property
+    def branch_graph(self):
+        """Maps every branch number to the list of ``(label, branch)``
+        tuples of its branch points and the branches emanating from them,
+        e.g. ``{1: [(2, 2)], 2: []}`` if branch 2 starts at the branch
+        point with label 2 on branch 1."""
+        return self.index.branch_graph
+
+    def branch_origin(self, branch):
+        """Returns the branch point that branch ``branch`` emanates from
+        or ``None``."""
+        label = self.index.origins.get(branch)
+        return None if label is None else self.index.point(label)
+
+    def dataframes(self):
+        """Returns ``raw_data`` as a list of ``pandas.DataFrame`` objects.
+        Requires pandas."""
+        return [table.to_dataframe() for table in self.raw_data]
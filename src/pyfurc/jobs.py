@@ -0,0 +1,220 @@
+import json
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from pyfurc.core import BifurcationProblemSolver
+from pyfurc.spec import problem_from_spec
+
+
+def _write_atomic(fname, write):
+    """Calls ``write`` with a temporary file next to ``fname`` and renames
+    it to ``fname`` afterwards, so readers never see partial files."""
+    dirc, base = os.path.split(fname)
+    tmp_name = os.path.join(dirc, f".{base}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        write(tmp_name)
+        os.replace(tmp_name, fname)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+class JobQueue:
+    """Job queue in a directory, which can be shared by workers on several
+    machines through a shared filesystem.
+
+    Every job is a problem specification (see
+    :func:`pyfurc.spec.problem_from_spec`) stored as ``{job_id}.json``
+    in one of the subdirectories ``pending``, ``running``, ``done`` and
+    ``failed``. A worker claims a job by renaming it from ``pending`` to
+    ``running``, which succeeds for exactly one worker. Finished jobs are
+    moved to ``done`` together with the solution file ``{job_id}.pfs``
+    (see :meth:`pyfurc.core.BifurcationProblemSolution.load`), failed
+    jobs are moved to ``failed``. The output of every job is written to
+    ``{job_id}.log`` next to it.
+
+    Parameters
+    ----------
+    directory : str
+        The queue directory. It is created if it does not exist.
+
+    Example
+    -------
+    >>> queue = JobQueue("queue")
+    >>> job_id = queue.submit(load_spec("hinged_cantilever.json"))
+    >>> work("queue")
+    >>> solution = BifurcationProblemSolution.load(queue.result(job_id))
+    """
+
+    states = ("pending", "running", "done", "failed")
+
+    def __init__(self, directory):
+        self.directory = directory
+        for state in self.states:
+            os.makedirs(os.path.join(directory, state), exist_ok=True)
+
+    def path(self, state, job_id, suffix=".json"):
+        return os.path.join(self.directory, state, job_id + suffix)
+
+    def _job_ids(self, state):
+        return sorted(
+            fname[: -len(".json")]
+            for fname in os.listdir(os.path.join(self.directory, state))
+            if fname.endswith(".json") and not fname.startswith(".")
+        )
+
+    def submit(self, spec, job_id=None):
+        """Adds the problem specification ``spec`` to the queue.
+
+        Returns
+        -------
+        str
+            The job id. A random one unless given.
+        """
+        if job_id is None:
+            job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+        def write(fname):
+            with open(fname, "w") as outfile:
+                json.dump(spec, outfile)
+
+        _write_atomic(self.path("pending", job_id), write)
+        return job_id
+
+    def claim(self):
+        """Moves the oldest pending job to ``running``.
+
+        Returns
+        -------
+        tuple or None
+            The job id and the problem specification or ``None`` if there
+            are no pending jobs.
+        """
+        for job_id in self._job_ids("pending"):
+            try:
+                os.rename(self.path("pending", job_id), self.path("running", job_id))
+            except FileNotFoundError:
+                # claimed by another worker
+                continue
+            with open(self.path("running", job_id), "r") as infile:
+                return job_id, json.load(infile)
+        return None
+
+    def _finish(self, job_id, state):
+        for suffix in [".log", ".json"]:
+            if os.path.exists(self.path("running", job_id, suffix)):
+                os.replace(
+                    self.path("running", job_id, suffix),
+                    self.path(state, job_id, suffix),
+                )
+
+    def complete(self, job_id, solution):
+        """Stores ``solution`` as result of the running job ``job_id``."""
+        _write_atomic(self.path("done", job_id, ".pfs"), solution.save)
+        self._finish(job_id, "done")
+
+    def fail(self, job_id):
+        """Marks the running job ``job_id`` as failed."""
+        self._finish(job_id, "failed")
+
+    def requeue(self):
+        """Moves all running jobs back to ``pending``, e.g. after workers
+        were killed. Must not be called while workers are active.
+
+        Returns
+        -------
+        list
+            The ids of the requeued jobs.
+        """
+        job_ids = self._job_ids("running")
+        for job_id in job_ids:
+            os.replace(self.path("running", job_id), self.path("pending", job_id))
+        return job_ids
+
+    def result(self, job_id):
+        """Returns the file name of the solution of job ``job_id`` or
+        ``None`` if the job is not done."""
+        fname = self.path("done", job_id, ".pfs")
+        return fname if os.path.isfile(fname) else None
+
+    def status(self):
+        """Returns the number of jobs in each state."""
+        return {state: len(self._job_ids(state)) for state in self.states}
+
+
+def solve_job(queue, job_id, spec, **solver_kwargs):
+    """Solves the claimed job ``job_id`` of ``queue``. All output is
+    written to the log file of the job. Errors mark the job as failed.
+
+    Returns
+    -------
+    bool
+        Whether the job was solved.
+    """
+    with open(queue.path("running", job_id, ".log"), "w") as log:
+        with redirect_stdout(log):
+            try:
+                problem = problem_from_spec(spec)
+                solver = BifurcationProblemSolver(
+                    problem, retention="delete", **solver_kwargs
+                )
+                solution = solver.solve()
+            except Exception:
+                traceback.print_exc(file=log)
+                solution = None
+    if solution is None:
+        queue.fail(job_id)
+        return False
+    queue.complete(job_id, solution)
+    return True
+
+
+def work(queue_dir, watch=False, poll_interval=1.0, **solver_kwargs):
+    """Solves the jobs of the queue in ``queue_dir`` one after another.
+
+    Parameters
+    ----------
+    queue_dir : str
+        Directory of the :class:`pyfurc.jobs.JobQueue`.
+    watch : bool, optional
+        Keep waiting for new jobs instead of returning once the queue is
+        empty.
+    poll_interval : float, optional
+        Seconds between checks for new jobs in ``watch`` mode.
+    **solver_kwargs
+        Passed on to :class:`pyfurc.core.BifurcationProblemSolver`, e.g.
+        ``cache``, ``store`` or ``work_dir``.
+
+    Returns
+    -------
+    dict
+        The number of ``done`` and ``failed`` jobs of this worker.
+    """
+    queue = JobQueue(queue_dir)
+    counts = {"done": 0, "failed": 0}
+    while True:
+        job = queue.claim()
+        if job is None:
+            if not watch:
+                return counts
+            time.sleep(poll_interval)
+            continue
+        job_id, spec = job
+        solved = solve_job(queue, job_id, spec, **solver_kwargs)
+        counts["done" if solved else "failed"] += 1
+        print(f"Job {job_id:s} {'done' if solved else 'failed'}")
+
+
+def run_workers(queue_dir, workers=1, **kwargs):
+    """Runs ``workers`` instances of :func:`pyfurc.jobs.work` in separate
+    processes and returns the summed counts."""
+    if workers == 1:
+        return work(queue_dir, **kwargs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(work, queue_dir, **kwargs) for _ in range(workers)]
+        results = [future.result() for future in futures]
+    return {key: sum(result[key] for result in results) for key in results[0]}
@@ -0,0 +1,43 @@
+from sympy.printing.fortran import FCodePrinter
+
+
+class AutoCodePrinter(FCodePrinter):
+    """Subclass of ``sympy.FCodePrinter`` with necessary parameters set
+    for printing AUTO-07p FORTRAN code.
+
+    See Also
+    --------
+    :doc:`Sympy Code Generation <sympy:modules/codegen>`
+
+    Parameters
+    ----------
+    wrap_lines : bool, optional
+        If ``False``, long lines are not wrapped, so that the output can
+        still be modified as a single line. Wrap it with :meth:`wrap`
+        afterwards. Default is ``True``.
+    """
+
+    def __init__(self, wrap_lines=True):
+        settings = {"source_format": "free", "standard": 95}
+        super().__init__(settings=settings)
+        self.wrap_lines = wrap_lines
+
+    def _wrap_fortran(self, lines):
+        if not self.wrap_lines:
+            return lines
+        return super()._wrap_fortran(lines)
+
+    def wrap(self, code):
+        """Wraps ``code`` printed with ``wrap_lines=False`` the same way
+        :meth:`doprint` with ``wrap_lines=True`` would have."""
+        return "\n".join(super()._wrap_fortran(code.splitlines()))
+
+    def _print_Symbol(self, expr):
+        try:
+            name = expr._name
+        except AttributeError:
+            name = expr.name
+        return name
+
+    def _print_Zero(self, expr):
+        return "0.0d0"
@@ -0,0 +1,100 @@
+import os
+import resource
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+PhaseRecord = namedtuple("PhaseRecord", ["name", "wall", "cpu", "child_cpu"])
+PhaseRecord.__doc__ = """Timing of a single phase of a solve: wall clock time,
+CPU time of the python process and CPU time of finished subprocesses
+(e.g. gfortran or AUTO-07p), all in seconds."""
+
+
+def _children_cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class SolveProfile:
+    """Timing and size information recorded while solving a problem.
+
+    A profile is attached to every solution as ``solution.profile``.
+    The phases recorded by :meth:`pyfurc.core.BifurcationProblemSolver.solve`
+    are ``differentiate``, ``print``, ``write``, ``cache``, ``compile``,
+    ``link``, ``run`` and ``parse``. Phases that were skipped, e.g.
+    ``compile`` on a cache hit, are missing.
+
+    CPU times are process wide, so they include the work of other threads
+    when several solves run concurrently.
+
+    Parameters
+    ----------
+    hooks : iterable of callable, optional
+        Called with each :class:`pyfurc.profiling.PhaseRecord` as soon as
+        the phase has finished, e.g. for exporting to a metrics system.
+
+    Variables
+    ---------
+    :ivar list phases: :class:`pyfurc.profiling.PhaseRecord` objects in
+        the order the phases were run.
+    :ivar dict sizes: Sizes in bytes of generated and output files.
+    :ivar dict counters: Further counts, e.g. the number of ``steps``
+        (points in ``fort.7``) and ``branches`` (tables in ``fort.7``).
+    """
+
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks) if hooks is not None else []
+        self.phases = []
+        self.sizes = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager measuring the phase ``name``."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        child_cpu = _children_cpu_time()
+        try:
+            yield
+        finally:
+            record = PhaseRecord(
+                name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                _children_cpu_time() - child_cpu,
+            )
+            self.phases.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+    def record_file_size(self, fname, key=None):
+        """Stores the size of ``fname`` under ``key``, by default its base
+        name. Missing files are ignored."""
+        if os.path.isfile(fname):
+            self.sizes[key or os.path.basename(fname)] = os.path.getsize(fname)
+
+    def wall_time(self, name=None):
+        """Total wall time of all phases or of the phases called ``name``."""
+        return sum(rec.wall for rec in self.phases if name in (None, rec.name))
+
+    def as_dict(self):
+        """Returns the profile as JSON serializable dictionary."""
+        return {
+            "phases": [rec._asdict() for rec in self.phases],
+            "sizes": dict(self.sizes),
+            "counters": dict(self.counters),
+        }
+
+    def __str__(self):
+        out = f"{'phase':<14s}{'wall [s]':>10s}{'cpu [s]':>10s}{'child [s]':>10s}\n"
+        for rec in self.phases:
+            out += (
+                f"{rec.name:<14s}{rec.wall:>10.4f}{rec.cpu:>10.4f}"
+                f"{rec.child_cpu:>10.4f}\n"
+            )
+        out += f"{'total':<14s}{self.wall_time():>10.4f}\n"
+        for name, size in self.sizes.items():
+            out += f"{name:<14s}{size:>10d} bytes\n"
+        for name, count in self.counters.items():
+            out += f"{name:<14s}{count:>10d}\n"
+        return out
@@ -0,0 +1,193 @@
+import ast
+import json
+import operator
+import os
+
+import sympy as sp
+
+from pyfurc.core import BifurcationProblem, Dof, Energy, Load, Parameter
+from pyfurc.util import AutoParameters
+
+problem_options = ("analytic_jacobian", "cse", "detect_folds", "processes")
+
+energy_functions = {
+    "sin": sp.sin,
+    "cos": sp.cos,
+    "tan": sp.tan,
+    "asin": sp.asin,
+    "acos": sp.acos,
+    "atan": sp.atan,
+    "sinh": sp.sinh,
+    "cosh": sp.cosh,
+    "tanh": sp.tanh,
+    "exp": sp.exp,
+    "log": sp.log,
+    "sqrt": sp.sqrt,
+    "Abs": sp.Abs,
+}
+"""Functions allowed in the energy expression of a problem specification."""
+
+energy_constants = {"pi": sp.pi, "E": sp.E}
+"""Constants allowed in the energy expression of a problem specification."""
+
+_binary_operators = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+
+_unary_operators = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def load_spec(fname):
+    """Reads a problem specification from a JSON or YAML file. YAML files
+    (``.yaml`` or ``.yml``) require PyYAML.
+
+    Returns
+    -------
+    dict
+    """
+    with open(fname, "r") as infile:
+        if os.path.splitext(fname)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as exc:
+                raise ImportError(
+                    "Reading YAML problem specifications requires PyYAML."
+                ) from exc
+            spec = yaml.safe_load(infile)
+        else:
+            spec = json.load(infile)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{fname:s} does not contain a problem specification.")
+    return spec
+
+
+def _quantities(cls, entries):
+    """Creates quantities from a list of names or a dictionary mapping
+    names to values."""
+    if isinstance(entries, str):
+        entries = [entries]
+    if not isinstance(entries, dict):
+        entries = {name: 0.0 for name in entries}
+    return {name: cls(name, value=float(value)) for name, value in entries.items()}
+
+
+def parse_energy(expr, quantities):
+    """Converts the energy expression ``expr`` of a problem specification
+    to a SymPy expression.
+
+    Unlike :func:`sympy.parsing.sympy_parser.parse_expr`, nothing is
+    evaluated by Python: only numbers, the names in ``quantities``, the
+    arithmetic operators ``+ - * / **`` and the functions and constants in
+    :data:`energy_functions` and :data:`energy_constants` are accepted, so
+    that specifications from a shared job queue cannot execute code.
+
+    Parameters
+    ----------
+    expr : str
+        The expression, e.g. ``"c/2*phi**2 - P*(1 - cos(phi))"``.
+    quantities : dict
+        Mapping of names to :class:`pyfurc.core.PhysicalQuantity` objects.
+
+    Raises
+    ------
+    ValueError
+        If ``expr`` contains anything else.
+    """
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid energy expression {expr!r}: {exc.msg}") from exc
+    return _convert(tree.body, quantities, expr)
+
+
+def _convert(node, quantities, expr):
+    if isinstance(node, ast.BinOp) and type(node.op) in _binary_operators:
+        return _binary_operators[type(node.op)](
+            _convert(node.left, quantities, expr),
+            _convert(node.right, quantities, expr),
+        )
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _unary_operators:
+        return _unary_operators[type(node.op)](_convert(node.operand, quantities, expr))
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        if isinstance(node.value, int):
+            return sp.Integer(node.value)
+        return sp.Float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id in quantities:
+            return quantities[node.id]
+        if node.id in energy_constants:
+            return energy_constants[node.id]
+        raise ValueError(f"Unknown name {node.id!r} in energy expression {expr!r}.")
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in energy_functions
+        and not node.keywords
+    ):
+        return energy_functions[node.func.id](
+            *(_convert(arg, quantities, expr) for arg in node.args)
+        )
+    raise ValueError(
+        f"Unsupported term {ast.get_source_segment(expr, node)!r} in energy "
+        f"expression {expr!r}."
+    )
+
+
+def problem_from_spec(spec):
+    """Creates a :class:`pyfurc.core.BifurcationProblem` from a problem
+    specification, i.e. a dictionary as read by
+    :func:`pyfurc.spec.load_spec`.
+
+    The specification has the keys
+
+    * ``energy``: The energy expression as string, e.g.
+      ``"c/2*phi**2 - P*(1 - cos(phi))"``.
+    * ``dofs``: Names of the degrees of freedom, either as list or as
+      dictionary mapping names to start values.
+    * ``load``: Name of the load or a dictionary mapping it to its start
+      value.
+    * ``params`` (optional): Dictionary mapping parameter names to values.
+    * ``name`` (optional): Name of the problem.
+    * ``auto_parameters`` (optional): AUTO-07p parameters, see
+      :class:`pyfurc.util.AutoParameters`.
+    * ``analytic_jacobian``, ``cse``, ``detect_folds``, ``processes``
+      (optional): Options of :class:`pyfurc.core.BifurcationProblem`.
+
+    The names of the quantities have to be valid python identifiers. The
+    energy expression is read with :func:`pyfurc.spec.parse_energy`, which
+    does not evaluate any Python code.
+
+    Example
+    -------
+    >>> spec = {
+    ...     "name": "hinged_cantilever",
+    ...     "energy": "phi**2/2 - P*(1 - cos(phi))",
+    ...     "dofs": ["phi"],
+    ...     "load": "P",
+    ...     "auto_parameters": {"RL1": 2.0},
+    ... }
+    >>> bf = problem_from_spec(spec)
+    """
+    for key in ["energy", "dofs", "load"]:
+        if key not in spec:
+            raise KeyError(f"The problem specification has no key {key!r}.")
+    quantities = {}
+    quantities.update(_quantities(Dof, spec["dofs"]))
+    quantities.update(_quantities(Load, spec["load"]))
+    quantities.update(_quantities(Parameter, spec.get("params", {})))
+    auto_parameters = spec.get("auto_parameters") or {}
+    unknown = sorted(set(auto_parameters) - set(AutoParameters()))
+    if unknown:
+        raise ValueError(f"Unknown AUTO-07p parameters: {', '.join(unknown)}.")
+    energy = Energy(parse_energy(spec["energy"], quantities))
+    options = {key: spec[key] for key in problem_options if key in spec}
+    return BifurcationProblem(
+        energy,
+        name=spec.get("name", "pyfurc_problem"),
+        params=spec.get("auto_parameters"),
+        **options,
+    )
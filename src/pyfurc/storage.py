@@ -0,0 +1,273 @@
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from pyfurc.util import AutoTable, Fort8Reader, labeled_points
+
+MAGIC = b"PYFURC\x00\x01"
+ALIGNMENT = 64
+"""Byte alignment of the arrays in a solution file."""
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class StoredSolutions:
+    """Labeled solutions read from a solution file. Provides the same
+    ``labels`` and ``record`` interface as :class:`pyfurc.util.Fort8Reader`
+    for the stored fields ``U`` and ``PAR``."""
+
+    header_fields = Fort8Reader.header_fields
+
+    def __init__(self, labels, headers, u, par):
+        self._records = {
+            label: (header, row)
+            for row, (label, header) in enumerate(zip(labels, headers))
+        }
+        self._u = u
+        self._par = par
+
+    def labels(self):
+        return list(self._records)
+
+    def record(self, label):
+        header, row = self._records[label]
+        rec = dict(header)
+        rec.update({"U": self._u[row], "PAR": self._par[row]})
+        return rec
+
+
+def write_solution_file(fname, tables, metadata, fort8=None):
+    """Writes branch tables, labeled solutions and metadata to a binary
+    solution file.
+
+    The file starts with the magic bytes ``PYFURC\\x00\\x01``, followed by
+    the length of a JSON header as little-endian unsigned 64 bit integer
+    and the header itself. The header holds the metadata, an index of the
+    labeled points and the dtype, shape and offset of every array. The
+    arrays are stored column by column, each aligned to 64 bytes, so they
+    can be memory mapped directly.
+
+    Parameters
+    ----------
+    fname : str
+        Output file name.
+    tables : list of :class:`pyfurc.util.AutoTable`
+        Branch tables as in ``BifurcationProblemSolution.raw_data``.
+    metadata : dict
+        JSON serializable problem metadata.
+    fort8 : :class:`pyfurc.util.Fort8Reader`, optional
+        Labeled solutions to store. Only the state vector ``U`` and the
+        parameters ``PAR`` of algebraic problems are stored.
+    """
+    arrays = []
+    header = {
+        "metadata": metadata,
+        "tables": [],
+        "points": labeled_points(tables),
+        "solutions": None,
+    }
+
+    def add_array(array):
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        arrays.append(array)
+        return {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "index": len(arrays) - 1,
+        }
+
+    for table in tables:
+        header["tables"].append(
+            {column: add_array(np.asarray(values)) for column, values in table.items()}
+        )
+
+    if fort8 is not None:
+        labels = fort8.labels()
+        records = [fort8.record(label) for label in labels]
+        records = [rec for rec in records if np.ndim(rec["U"]) == 1]
+        if records:
+            header["solutions"] = {
+                "headers": [
+                    {field: rec[field] for field in fort8.header_fields}
+                    for rec in records
+                ],
+                "U": add_array(np.array([rec["U"] for rec in records])),
+                "PAR": add_array(np.array([rec["PAR"] for rec in records])),
+            }
+
+    # offsets depend on the header length, which depends on the offsets
+    offsets = [0] * len(arrays)
+    header["offsets"] = offsets
+    while True:
+        header_bytes = json.dumps(header).encode()
+        offset = _aligned(len(MAGIC) + 8 + len(header_bytes))
+        new_offsets = []
+        for array in arrays:
+            new_offsets.append(offset)
+            offset = _aligned(offset + array.nbytes)
+        if new_offsets == offsets:
+            break
+        offsets[:] = new_offsets
+
+    with open(fname, "wb") as outfile:
+        outfile.write(MAGIC)
+        outfile.write(struct.pack("<Q", len(header_bytes)))
+        outfile.write(header_bytes)
+        for offset, array in zip(offsets, arrays):
+            outfile.write(b"\0" * (offset - outfile.tell()))
+            outfile.write(array.tobytes())
+
+
+def read_solution_file(fname, mmap=True):
+    """Reads a file written by :func:`pyfurc.storage.write_solution_file`.
+
+    Parameters
+    ----------
+    fname : str
+        Solution file name.
+    mmap : bool, optional
+        If ``True`` (default), the arrays are read-only views into a
+        memory map of the file. Otherwise they are read into memory.
+
+    Returns
+    -------
+    tuple
+        The list of :class:`pyfurc.util.AutoTable` objects, a
+        :class:`pyfurc.storage.StoredSolutions` object or ``None``, the
+        metadata and the index of labeled points.
+    """
+    with open(fname, "rb") as infile:
+        if infile.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{fname:s} is not a pyfurc solution file.")
+        (header_length,) = struct.unpack("<Q", infile.read(8))
+        header = json.loads(infile.read(header_length))
+
+    if mmap:
+        buffer = np.memmap(fname, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(fname, dtype=np.uint8)
+
+    def get_array(info):
+        dtype = np.dtype(info["dtype"])
+        offset = header["offsets"][info["index"]]
+        nbytes = dtype.itemsize * int(np.prod(info["shape"]))
+        return buffer[offset : offset + nbytes].view(dtype).reshape(info["shape"])
+
+    tables = []
+    for table_info in header["tables"]:
+        table = AutoTable()
+        for column, info in table_info.items():
+            table[column] = get_array(info)
+        tables.append(table)
+
+    solutions = None
+    if header["solutions"] is not None:
+        sol_info = header["solutions"]
+        solutions = StoredSolutions(
+            [hdr["LAB"] for hdr in sol_info["headers"]],
+            sol_info["headers"],
+            get_array(sol_info["U"]),
+            get_array(sol_info["PAR"]),
+        )
+    return tables, solutions, header["metadata"], header["points"]
+
+
+def default_store_dir():
+    """Returns the default location of the solution store, i.e.
+    ``$XDG_CACHE_HOME/pyfurc/solutions`` or ``~/.cache/pyfurc/solutions``."""
+    base_dir = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(base_dir, "pyfurc", "solutions")
+
+
+class SolutionStore:
+    """Local store of solutions, addressed by the fingerprint of the solved
+    problem and the solver backend, see
+    :meth:`pyfurc.core.BifurcationProblem.fingerprint`.
+
+    Solutions are kept as solution files (see
+    :func:`pyfurc.storage.write_solution_file`) named after the
+    fingerprint. Entries are written to a temporary file first and then
+    renamed, so several processes can share one store.
+
+    Parameters
+    ----------
+    store_dir : str, optional
+        Directory holding the solution files. Defaults to
+        :func:`pyfurc.storage.default_store_dir`.
+
+    Variables
+    ---------
+    :ivar int hits: Number of solutions found in the store by this instance.
+    :ivar int misses: Number of unsuccessful lookups of this instance.
+
+    Example
+    -------
+    >>> store = pf.SolutionStore()
+    >>> solver = pf.BifurcationProblemSolver(bf, store=store)
+    >>> solver.solve()  # runs AUTO-07p
+    >>> solver.solve()  # returns the stored solution
+    >>> store.stats()
+    {'hits': 1, 'misses': 1, 'entries': 1, 'size': 2496}
+    """
+
+    suffix = ".pfs"
+
+    def __init__(self, store_dir=None):
+        self.store_dir = store_dir if store_dir is not None else default_store_dir()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def _entry(self, fingerprint):
+        return os.path.join(self.store_dir, fingerprint + self.suffix)
+
+    def lookup(self, fingerprint):
+        """Returns the file name of the solution stored for ``fingerprint``
+        or ``None``."""
+        entry = self._entry(fingerprint)
+        if os.path.isfile(entry):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def add(self, fingerprint, solution):
+        """Stores ``solution`` under ``fingerprint``."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            solution.save(tmp_name)
+            os.replace(tmp_name, self._entry(fingerprint))
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def _entries(self):
+        return [
+            os.path.join(self.store_dir, fname)
+            for fname in os.listdir(self.store_dir)
+            if fname.endswith(self.suffix)
+        ]
+
+    def stats(self):
+        """Returns hit/miss counts of this instance together with the
+        number of entries and the total size of the store in bytes."""
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "size": sum(os.path.getsize(entry) for entry in entries),
+        }
+
+    def clear(self):
+        """Removes all stored solutions."""
+        for entry in self._entries():
+            os.remove(entry)
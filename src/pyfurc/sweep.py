@@ -0,0 +1,250 @@
+import itertools
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from pyfurc.core import (
+    BifurcationProblemSolution,
+    BifurcationProblemSolver,
+    PhysicalQuantity,
+)
+from pyfurc.tools import (
+    build_auto_executable,
+    run_auto_executable,
+    setup_auto_exec_env,
+)
+from pyfurc.util import DataDir
+
+
+def _build(dirc, p_name, compile_flags, link_flags, cache):
+    env = setup_auto_exec_env()
+    build_auto_executable(
+        dirc,
+        p_name,
+        env,
+        compile_flags=compile_flags,
+        link_flags=link_flags,
+        cache=cache,
+        silent=True,
+    )
+    if not os.path.isfile(os.path.join(dirc, f"{p_name}.out")):
+        raise RuntimeError(f"Building the executable in {dirc:s} failed.")
+
+
+def _solve(dirc, p_name):
+    env = setup_auto_exec_env()
+    out, err = run_auto_executable(dirc, p_name, env)
+    if not os.path.isfile(os.path.join(dirc, "fort.7")):
+        raise RuntimeError(f"AUTO-07p produced no output in {dirc:s}:\n{err:s}")
+    solution = BifurcationProblemSolution()
+    solution.read_solution(dirc)
+    return solution
+
+
+class SweepResult:
+    """Indexed result set of a :class:`pyfurc.sweep.BifurcationSweep`.
+
+    Variables
+    ---------
+    :ivar list points: The grid points, i.e. dictionaries mapping
+        quantities and AUTO-07p parameter names to values.
+    :ivar dict solutions: :class:`pyfurc.core.BifurcationProblemSolution`
+        objects of all successful runs by grid index.
+    :ivar dict errors: Exceptions of all failed runs by grid index.
+    :ivar str directory: Directory holding one subdirectory per run.
+    :ivar int executables: Number of distinct executables that were built.
+    """
+
+    def __init__(self, points, directory, executables=0):
+        self.points = points
+        self.directory = directory
+        self.executables = executables
+        self.solutions = {}
+        self.errors = {}
+
+    def __getitem__(self, index):
+        if index in self.errors:
+            raise KeyError(f"Run {index:d} failed: {self.errors[index]!r}")
+        return self.solutions[index]
+
+    def __len__(self):
+        return len(self.points)
+
+    def __iter__(self):
+        """Iterates over ``(point, solution)`` tuples. ``solution`` is
+        ``None`` for failed runs."""
+        for index, point in enumerate(self.points):
+            yield point, self.solutions.get(index)
+
+    def failed(self):
+        """Returns the grid indices of all failed runs."""
+        return sorted(self.errors)
+
+
+class BifurcationSweep:
+    """Solves a :class:`pyfurc.core.BifurcationProblem` for many
+    combinations of quantity values and AUTO-07p parameters.
+
+    The FORTRAN sources of all grid points are generated up front with
+    ``runtime_start_values`` enabled, so quantity values and AUTO-07p
+    parameters are only written to data files. Every distinct source is
+    compiled only once and its executable is shared by all runs that need
+    it. Building and running is spread over a process pool. A failing run
+    is recorded in the result and does not affect the other runs.
+
+    Parameters
+    ----------
+    problem : :class:`pyfurc.core.BifurcationProblem`
+        The problem to solve.
+    grid : dict or list of dict
+        Either a dictionary mapping keys to lists of values, whose
+        cartesian product is swept, or a list of dictionaries mapping keys
+        to values. Keys are :class:`pyfurc.core.PhysicalQuantity` objects
+        contained in the energy or names of AUTO-07p parameters.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    cache : :class:`pyfurc.cache.ExecutableCache`, optional
+        Executable cache used when building.
+    base_dir : str, optional
+        Directory in which the sweep directory is created. Defaults to
+        ``$PYFURC_WORK_DIR`` or the current working directory.
+
+    Example
+    -------
+    >>> sweep = pf.BifurcationSweep(bf, {imperfection: [0.0, 0.01, 0.1], "DS": [0.1, 0.05]})
+    >>> result = sweep.run()
+    >>> result[0].raw_data[0]
+    """
+
+    def __init__(self, problem, grid, processes=None, cache=None, base_dir=None):
+        self.problem = problem
+        self.points = self._expand_grid(grid)
+        self.processes = processes
+        self.cache = cache
+        self.base_dir = base_dir
+
+    @staticmethod
+    def _expand_grid(grid):
+        if isinstance(grid, dict):
+            keys = list(grid)
+            return [
+                dict(zip(keys, values))
+                for values in itertools.product(*(grid[key] for key in keys))
+            ]
+        return [dict(point) for point in grid]
+
+    @contextmanager
+    def _applied(self, point):
+        """Temporarily sets the values of ``point`` on the problem."""
+        energy = self.problem.energy
+        old_values = {}
+        try:
+            for key, value in point.items():
+                if isinstance(key, PhysicalQuantity):
+                    for dicti in [energy.params, energy.dofs, energy.load]:
+                        if key in dicti:
+                            old_values[key] = dicti[key]["value"]
+                    self.problem.set_quantity_value(key, value)
+                else:
+                    if key in self.problem.problem_parameters:
+                        old_values[key] = self.problem.problem_parameters[key]
+                    else:
+                        old_values[key] = self.problem._other_parameters[key]
+                    self.problem.set_parameter(key, value)
+            yield
+        finally:
+            for key, value in old_values.items():
+                if isinstance(key, PhysicalQuantity):
+                    self.problem.set_quantity_value(key, value)
+                elif key in self.problem.problem_parameters:
+                    self.problem.problem_parameters[key] = value
+                else:
+                    self.problem._other_parameters[key] = value
+
+    def prepare(self):
+        """Writes source and constants files of all grid points.
+
+        Returns
+        -------
+        tuple
+            The sweep directory, the run directories and a dictionary
+            mapping each distinct source to the indices of its runs.
+        """
+        solver = BifurcationProblemSolver(
+            self.problem, cache=self.cache, runtime_start_values=True
+        )
+        p_name = self.problem.problem_name
+        ddir = DataDir(base_dir=self.base_dir, name=p_name + "_sweep")
+        ddir.create_dir()
+        func = solver._f_func()
+        run_dirs = []
+        groups = {}
+        self._metadata = []
+        for index, point in enumerate(self.points):
+            dirc = ddir.create_subdir(f"run_{index:05d}")
+            with self._applied(point):
+                source = solver.fortran_source(func=func)
+                self._metadata.append(self.problem.metadata())
+                solver.write_const_file(basedir=dirc, silent=True)
+                solver.write_stpnt_file(basedir=dirc, silent=True)
+            with open(os.path.join(dirc, p_name + ".f90"), "w") as outfile:
+                outfile.write(source)
+            run_dirs.append(dirc)
+            groups.setdefault(source, []).append(index)
+        self._solver = solver
+        return str(ddir), run_dirs, groups
+
+    def run(self):
+        """Builds and runs all grid points.
+
+        Returns
+        -------
+        :class:`pyfurc.sweep.SweepResult`
+        """
+        directory, run_dirs, groups = self.prepare()
+        solver = self._solver
+        p_name = self.problem.problem_name
+        result = SweepResult(self.points, directory, executables=len(groups))
+        print(
+            f"Sweeping {len(self.points):d} runs with "
+            f"{len(groups):d} distinct executable(s)"
+        )
+        with ProcessPoolExecutor(max_workers=self.processes) as pool:
+            builds = {
+                pool.submit(
+                    _build,
+                    run_dirs[indices[0]],
+                    p_name,
+                    solver.compile_flags,
+                    solver.link_flags,
+                    self.cache,
+                ): indices
+                for indices in groups.values()
+            }
+            runs = {}
+            for build, indices in builds.items():
+                try:
+                    build.result()
+                except Exception as exc:
+                    for index in indices:
+                        result.errors[index] = exc
+                    continue
+                executable = os.path.join(run_dirs[indices[0]], f"{p_name}.out")
+                for index in indices:
+                    if index != indices[0]:
+                        target = os.path.join(run_dirs[index], f"{p_name}.out")
+                        try:
+                            os.link(executable, target)
+                        except OSError:
+                            shutil.copy2(executable, target)
+                    runs[pool.submit(_solve, run_dirs[index], p_name)] = index
+            for run, index in runs.items():
+                try:
+                    result.solutions[index] = run.result()
+                    result.solutions[index].metadata = self._metadata[index]
+                except Exception as exc:
+                    result.errors[index] = exc
+        if result.errors:
+            print(f"{len(result.errors):d} of {len(self.points):d} runs failed")
+        return result
@@ -1,5 +1,14 @@
+import asyncio
 import importlib.resources
+import math
 import os
+import signal
+from contextlib import nullcontext
+from subprocess import PIPE, Popen, TimeoutExpired
+
+STPNT_ENV_VAR = "PYFURC_STPNT"
+"""Environment variable holding the path of the start values file read by
+executables generated with ``runtime_start_values``."""
 
 
 def setup_auto_exec_env():
@@ -20,3 +29,487 @@ def setup_auto_exec_env():
 
     env["LD_LIBRARY_PATH"] = str(auto_lib_dir)
     return env
+
+
+def _cache_key(dirc, p_name, env, compile_flags, link_flags, cache):
+    with open(os.path.join(dirc, f"{p_name}.f90"), "rb") as source:
+        return cache.key(
+            source.read(),
+            list(compile_flags) + list(link_flags),
+            env["LD_LIBRARY_PATH"],
+        )
+
+
+def _compile_cmd(p_name, compile_flags):
+    return (
+        ["gfortran"]
+        + list(compile_flags)
+        + ["-c", f"{p_name}.f90", "-o", f"{p_name}.o"]
+    )
+
+
+def _link_cmd(p_name, env, link_flags):
+    return (
+        ["gfortran", f"-L{env['LD_LIBRARY_PATH']}"]
+        + list(link_flags)
+        + [f"{p_name}.o", "-lauto", "-o", f"{p_name}.out"]
+    )
+
+
+def _run_env(dirc, p_name, env):
+    """Adds the path of the start values file to ``env`` if it exists."""
+    stpnt_file = os.path.join(dirc, f"stpnt.{p_name}")
+    if os.path.isfile(stpnt_file):
+        env = dict(env)
+        env[STPNT_ENV_VAR] = os.path.abspath(stpnt_file)
+    return env
+
+
+def _limit_resources(pid, cpu_time=None, memory=None):
+    """Sets the CPU time limit ``cpu_time`` (in seconds) and the address
+    space limit ``memory`` (in bytes) of the running process ``pid``.
+
+    The limits are set from the parent with ``prlimit`` instead of in a
+    ``preexec_fn``, which may deadlock the child when the parent has
+    threads. This requires Linux.
+    """
+    if cpu_time is None and memory is None:
+        return
+    import resource
+
+    if not hasattr(resource, "prlimit"):
+        raise NotImplementedError("CPU time and memory limits require Linux.")
+    try:
+        if cpu_time is not None:
+            # SIGXCPU at the soft limit, SIGKILL one second later
+            seconds = max(int(math.ceil(cpu_time)), 1)
+            resource.prlimit(pid, resource.RLIMIT_CPU, (seconds, seconds + 1))
+        if memory is not None:
+            resource.prlimit(pid, resource.RLIMIT_AS, (int(memory), int(memory)))
+    except ProcessLookupError:
+        # the process has already finished
+        pass
+
+
+def kill_process_group(process):
+    """Kills ``process`` and all processes it started and waits for it.
+    The process has to be the leader of its own process group, as the
+    processes started by the functions of this module are."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+def _communicate(process, timeout, name):
+    """``process.communicate()`` that kills the process group and raises
+    ``TimeoutError`` after ``timeout`` seconds."""
+    try:
+        return process.communicate(timeout=timeout)
+    except TimeoutExpired:
+        kill_process_group(process)
+        process.communicate()
+        raise TimeoutError(f"{name} took longer than {timeout} s.")
+    except KeyboardInterrupt:
+        # the process group does not receive the SIGINT of the terminal
+        kill_process_group(process)
+        raise
+
+
+RUN_STATUSES = ("complete", "timeout", "cpu_limit", "cancelled", "error")
+"""Possible outcomes of an AUTO-07p run, see :func:`run_status`."""
+
+
+def run_status(returncode, timed_out=False, cancelled=False):
+    """Classifies the end of an AUTO-07p run by the return code of the
+    executable. A run killed after exceeding its CPU time limit ends with
+    ``SIGXCPU``. Exceeding the memory limit makes AUTO-07p abort with an
+    error.
+
+    Returns
+    -------
+    str
+        One of :data:`pyfurc.tools.RUN_STATUSES`.
+    """
+    if cancelled:
+        return "cancelled"
+    if timed_out:
+        return "timeout"
+    if returncode == 0:
+        return "complete"
+    if returncode == -signal.SIGXCPU:
+        return "cpu_limit"
+    return "error"
+
+
+def _phase(profile, name):
+    """Measures phase ``name`` if a profile is given."""
+    return profile.phase(name) if profile is not None else nullcontext()
+
+
+_NO_COMPILER_MESSAGE = (
+    "Something went wrong when calling the "
+    "Fortran compiler. Maybe gfortran is not installed?"
+)
+
+
+def build_auto_executable(
+    dirc,
+    p_name,
+    env,
+    compile_flags=("-O",),
+    link_flags=("-O",),
+    cache=None,
+    silent=False,
+    profile=None,
+    timeouts=None,
+    on_process=None,
+):
+    """Compiles ``{p_name}.f90`` in ``dirc`` and links it against the
+    AUTO-07p library into the executable ``{p_name}.out``.
+
+    Parameters
+    ----------
+    dirc : str
+        Directory containing the FORTRAN source.
+    p_name : str
+        Problem name, i.e. base name of the source file.
+    env : dict
+        Environment as returned by :func:`pyfurc.tools.setup_auto_exec_env`.
+    compile_flags, link_flags : sequence of str, optional
+        Flags passed to gfortran when compiling and linking.
+    cache : :class:`pyfurc.cache.ExecutableCache`, optional
+        Cache to look the executable up in. Compiling and linking are
+        skipped on a cache hit, successful builds are added to the cache.
+    silent : bool, optional
+        Suppress printing of the build commands.
+    profile : :class:`pyfurc.profiling.SolveProfile`, optional
+        Records the phases ``cache``, ``compile`` and ``link``.
+    timeouts : dict, optional
+        Maximum durations of the phases ``"compile"`` and ``"link"`` in
+        seconds.
+    on_process : callable, optional
+        Called with the compiler and linker processes right after they
+        have been started, e.g. to kill them from another thread. If the
+        compiler is killed, nothing is linked.
+
+    Returns
+    -------
+    bool
+        ``True`` if the executable was taken from ``cache``.
+
+    Raises
+    ------
+    TimeoutError
+        If compiling or linking takes longer than its timeout. The
+        compiler is killed.
+    """
+    timeouts = timeouts or {}
+    executable = os.path.join(dirc, f"{p_name}.out")
+    cache_key = None
+    if cache is not None:
+        with _phase(profile, "cache"):
+            cache_key = _cache_key(dirc, p_name, env, compile_flags, link_flags, cache)
+            hit = cache.fetch(cache_key, executable)
+        if hit:
+            if not silent:
+                print(f"Using cached executable for problem {p_name}")
+            return True
+
+    if not silent:
+        print(f"Compiling FORTRAN source for problem {p_name}")
+    compile_cmd = _compile_cmd(p_name, compile_flags)
+    if not silent:
+        print(" ".join(compile_cmd))
+
+    try:
+        with _phase(profile, "compile"):
+            compile_process = Popen(
+                compile_cmd,
+                stderr=PIPE,
+                stdout=PIPE,
+                cwd=dirc,
+                start_new_session=True,
+            )
+            if on_process is not None:
+                on_process(compile_process)
+            out, err = _communicate(
+                compile_process, timeouts.get("compile"), f"Compiling {p_name}"
+            )
+    except FileNotFoundError:
+        # This should mean gfortran is not installed
+        raise OSError(_NO_COMPILER_MESSAGE)
+    if compile_process.returncode < 0:
+        # killed by a signal
+        return False
+
+    if not silent:
+        print("Linking...")
+    link_cmd = _link_cmd(p_name, env, link_flags)
+    if not silent:
+        print(" ".join(link_cmd))
+
+    with _phase(profile, "link"):
+        link_process = Popen(
+            link_cmd,
+            cwd=dirc,
+            stderr=PIPE,
+            stdout=PIPE,
+            env=env,
+            start_new_session=True,
+        )
+        if on_process is not None:
+            on_process(link_process)
+        out, err = _communicate(link_process, timeouts.get("link"), f"Linking {p_name}")
+
+    if cache is not None and os.path.isfile(executable):
+        with _phase(profile, "cache"):
+            cache.store(cache_key, executable)
+    return False
+
+
+def run_auto_executable(dirc, p_name, env):
+    """Runs the executable ``{p_name}.out`` in ``dirc`` with the constants
+    file ``c.{p_name}`` as input. If a start values file ``stpnt.{p_name}``
+    exists in ``dirc``, its path is passed to the executable.
+
+    Returns
+    -------
+    tuple of str
+        stdout and stderr of the AUTO-07p run.
+    """
+    run_process = start_auto_executable(dirc, p_name, env, stdout=PIPE, stderr=PIPE)
+    out, err = run_process.communicate()
+    return out, err
+
+
+def start_auto_executable(
+    dirc, p_name, env, stdout=None, stderr=None, cpu_time=None, memory=None
+):
+    """Starts the executable ``{p_name}.out`` in ``dirc`` with the constants
+    file ``c.{p_name}`` as input without waiting for it to finish. The
+    executable runs in a new process group, see
+    :func:`pyfurc.tools.kill_process_group`.
+
+    Parameters
+    ----------
+    stdout, stderr : optional
+        Passed on to ``subprocess.Popen``.
+    cpu_time : float, optional
+        CPU time limit of the executable in seconds.
+    memory : int, optional
+        Address space limit of the executable in bytes.
+
+    Returns
+    -------
+    subprocess.Popen
+    """
+    with open(os.path.join(dirc, f"c.{p_name}")) as parameters:
+        process = Popen(
+            [f"./{p_name}.out"],
+            cwd=dirc,
+            stderr=stderr,
+            stdout=stdout,
+            stdin=parameters,
+            env=_run_env(dirc, p_name, env),
+            universal_newlines=True,
+            start_new_session=True,
+        )
+    _limit_resources(process.pid, cpu_time, memory)
+    return process
+
+
+def wait_auto_executable(process, timeout=None):
+    """Waits for an executable started with
+    :func:`pyfurc.tools.start_auto_executable` to finish. After
+    ``timeout`` seconds its process group is killed.
+
+    Returns
+    -------
+    tuple
+        The return code and whether the timeout was hit.
+    """
+    try:
+        return process.wait(timeout=timeout), False
+    except TimeoutExpired:
+        kill_process_group(process)
+        return process.returncode, True
+
+
+class _null_context:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+async def _stream_process(
+    cmd,
+    dirc,
+    env,
+    semaphore,
+    on_output,
+    stdin=None,
+    timeout=None,
+    name=None,
+    cpu_time=None,
+    memory=None,
+):
+    """Runs ``cmd`` as asyncio subprocess in a new process group, passing
+    every line of its combined stdout and stderr to ``on_output``. Returns
+    the return code and the complete output. After ``timeout`` seconds the
+    process group is killed and ``TimeoutError`` is raised. It is killed
+    as well if the task is cancelled. ``cpu_time`` and ``memory`` limit
+    the process, see :func:`pyfurc.tools.start_auto_executable`."""
+    async with semaphore if semaphore is not None else _null_context():
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=dirc,
+            env=env,
+            stdin=stdin,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        _limit_resources(process.pid, cpu_time, memory)
+        output = []
+
+        async def communicate():
+            async for raw_line in process.stdout:
+                line = raw_line.decode(errors="replace")
+                output.append(line)
+                if on_output is not None:
+                    on_output(line)
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill_process_group_async(process)
+            raise TimeoutError(f"{name or cmd[0]} took longer than {timeout} s.")
+        except asyncio.CancelledError:
+            await _kill_process_group_async(process)
+            raise
+        return returncode, "".join(output)
+
+
+async def _kill_process_group_async(process):
+    """Coroutine version of :func:`pyfurc.tools.kill_process_group` for
+    asyncio subprocesses."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+
+async def build_auto_executable_async(
+    dirc,
+    p_name,
+    env,
+    compile_flags=("-O",),
+    link_flags=("-O",),
+    cache=None,
+    semaphore=None,
+    on_output=None,
+    profile=None,
+    timeouts=None,
+):
+    """Coroutine version of :func:`pyfurc.tools.build_auto_executable`.
+
+    The compiler and linker run as asyncio subprocesses, each of them
+    inside ``semaphore`` if given. Their output is passed line by line to
+    ``on_output``. Cache lookups run in the default executor so that the
+    event loop is blocked neither by hashing the sources nor by the cache
+    lock.
+
+    Returns
+    -------
+    bool
+        ``True`` if the executable was taken from ``cache``.
+    """
+    timeouts = timeouts or {}
+    loop = asyncio.get_running_loop()
+    executable = os.path.join(dirc, f"{p_name}.out")
+    cache_key = None
+    if cache is not None:
+        with _phase(profile, "cache"):
+            cache_key = await loop.run_in_executor(
+                None, _cache_key, dirc, p_name, env, compile_flags, link_flags, cache
+            )
+            hit = await loop.run_in_executor(None, cache.fetch, cache_key, executable)
+        if hit:
+            return True
+
+    try:
+        with _phase(profile, "compile"):
+            await _stream_process(
+                _compile_cmd(p_name, compile_flags),
+                dirc,
+                env,
+                semaphore,
+                on_output,
+                timeout=timeouts.get("compile"),
+                name=f"Compiling {p_name}",
+            )
+    except FileNotFoundError:
+        raise OSError(_NO_COMPILER_MESSAGE)
+    with _phase(profile, "link"):
+        await _stream_process(
+            _link_cmd(p_name, env, link_flags),
+            dirc,
+            env,
+            semaphore,
+            on_output,
+            timeout=timeouts.get("link"),
+            name=f"Linking {p_name}",
+        )
+
+    if cache is not None and os.path.isfile(executable):
+        with _phase(profile, "cache"):
+            await loop.run_in_executor(None, cache.store, cache_key, executable)
+    return False
+
+
+async def run_auto_executable_async(
+    dirc,
+    p_name,
+    env,
+    semaphore=None,
+    on_output=None,
+    timeout=None,
+    cpu_time=None,
+    memory=None,
+):
+    """Coroutine version of :func:`pyfurc.tools.run_auto_executable`.
+
+    The AUTO-07p output is passed line by line to ``on_output`` while the
+    executable is running. ``cpu_time`` and ``memory`` limit the
+    executable as in :func:`pyfurc.tools.start_auto_executable`.
+
+    Returns
+    -------
+    tuple
+        The return code and the combined stdout and stderr of the run.
+
+    Raises
+    ------
+    TimeoutError
+        If the run takes longer than ``timeout`` seconds. The executable
+        is killed.
+    """
+    with open(os.path.join(dirc, f"c.{p_name}")) as parameters:
+        return await _stream_process(
+            [f"./{p_name}.out"],
+            dirc,
+            _run_env(dirc, p_name, env),
+            semaphore,
+            on_output,
+            stdin=parameters,
+            timeout=timeout,
+            name=f"Running {p_name}",
+            cpu_time=cpu_time,
+            memory=memory,
+        )
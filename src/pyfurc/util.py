@@ -1,43 +1,71 @@
+import mmap
 import os
+import shutil
+import uuid
+from collections import namedtuple
 from datetime import datetime as dt
 
-from pandas import read_csv
-from sympy.printing.fortran import FCodePrinter
+import numpy as np
 
 
-class AutoCodePrinter(FCodePrinter):
-    """Subclass of ``sympy.FCodePrinter`` with necessary parameters set
-    for printing AUTO-07p FORTRAN code.
+def __getattr__(name):
+    # AutoCodePrinter lives in pyfurc.printing, which imports the sympy
+    # printing machinery. It is only loaded when actually needed.
+    if name == "AutoCodePrinter":
+        from pyfurc.printing import AutoCodePrinter
 
-    See Also
-    --------
-    :doc:`Sympy Code Generation <sympy:modules/codegen>`
-    """
+        return AutoCodePrinter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def __init__(self):
-        settings = {"source_format": "free", "standard": 95}
-        super().__init__(settings=settings)
 
-    def _print_Symbol(self, expr):
-        try:
-            name = expr._name
-        except AttributeError:
-            name = expr.name
-        return name
+WORK_DIR_ENV_VAR = "PYFURC_WORK_DIR"
+"""Environment variable holding the default base directory of solution
+directories, e.g. ``/dev/shm/pyfurc`` to keep intermediate files in RAM."""
 
-    def _print_Zero(self, expr):
-        return "0.0d0"
+
+def default_work_dir():
+    """Returns the base directory for solution directories, i.e. the value
+    of ``$PYFURC_WORK_DIR`` or the current working directory."""
+    return os.environ.get(WORK_DIR_ENV_VAR, "./")
 
 
 class DataDir:
-    def __init__(self, base_dir="./", name=""):
+    """Uniquely named working directory ``{name}_{YYYYmmdd_HHMMSS}_{suffix}``.
+
+    The random suffix makes names unique across threads and processes.
+    Creation is atomic; should a name exist nonetheless, a new suffix is
+    drawn.
+
+    Parameters
+    ----------
+    base_dir : str, optional
+        Directory in which the directory is created. It is created if
+        necessary. Defaults to :func:`pyfurc.util.default_work_dir`.
+    name : str, optional
+        Prefix of the directory name.
+    """
+
+    def __init__(self, base_dir=None, name=""):
+        self.base_dir = base_dir if base_dir is not None else default_work_dir()
+        self.name = name
         self.date_time = dt.now().strftime(r"%Y%m%d_%H%M%S")
-        self.directory = os.path.join(base_dir, f"{name}_{self.date_time}")
+        self.directory = self._new_directory()
         self.codedir = self.directory + "code/"
         self.dir_created = False
 
+    def _new_directory(self):
+        suffix = uuid.uuid4().hex[:8]
+        return os.path.join(self.base_dir, f"{self.name}_{self.date_time}_{suffix}")
+
     def create_dir(self):
-        os.mkdir(self.directory)
+        os.makedirs(self.base_dir, exist_ok=True)
+        while True:
+            try:
+                os.mkdir(self.directory)
+                break
+            except FileExistsError:
+                self.directory = self._new_directory()
+                self.codedir = self.directory + "code/"
         self.dir_created = True
 
     def dir(self):
@@ -47,10 +75,9 @@ class DataDir:
         return self.directory
 
     def create_subdir(self, name):
-        os.mkdir(os.path.join(self.directory, name))
         if not self.dir_created:
-            self.dir_created = True
-            os.mkdir(self.directory)
+            self.create_dir()
+        os.mkdir(os.path.join(self.directory, name))
         return self.directory + "/" + name + "/"
 
 
@@ -188,32 +215,478 @@ class HiddenAutoParameters(ParamDict):
         self.update(default_parameters)
 
 
+POINT_TYPES = {
+    0: "",
+    1: "BP",
+    2: "LP",
+    3: "HB",
+    4: "RG",
+    -4: "UZ",
+    5: "LP",
+    6: "BP",
+    7: "PD",
+    8: "TR",
+    9: "EP",
+    -9: "MX",
+    -21: "BT",
+    -22: "CP",
+    -23: "ZH",
+    -32: "GH",
+    -55: "R1",
+    -65: "R2",
+    -75: "R3",
+    -85: "R4",
+    -76: "LPD",
+    -86: "LTR",
+    -87: "PTR",
+    -88: "TTR",
+}
+"""Names of the AUTO-07p point type codes in the ``TY`` column of ``fort.7``."""
+
+
+def point_type_code(code):
+    """Strips the branch type from an AUTO-07p point type code. In
+    continuations of critical points, AUTO-07p writes ``10 * branch_type
+    + type``, e.g. 19 for an end point of a branch point continuation.
+    Negative codes are returned unchanged, their two digits denote
+    codimension-two points such as -21 for a Bogdanov-Takens point."""
+    code = int(code)
+    return code % 10 if code >= 0 else code
+
+
+def point_type_name(code):
+    """Returns the name of an AUTO-07p point type code, e.g. ``"BP"`` for 1."""
+    code = point_type_code(code)
+    return POINT_TYPES.get(code, str(code))
+
+
+ContinuationPoint = namedtuple(
+    "ContinuationPoint", ["branch", "point", "type", "label", "par", "l2norm", "u"]
+)
+ContinuationPoint.__doc__ = """A single point of a continuation as written to
+``fort.7``: branch number, point number, point type name (see
+:data:`pyfurc.util.POINT_TYPES`), label, value of ``PAR(1)``, L2-norm and
+the NumPy array of the printed ``U`` values."""
+
+
+def _fortran_float(token):
+    try:
+        return float(token)
+    except ValueError:
+        # three-digit exponents are written without "E", e.g. 1.7976+308
+        mantissa, sign, exponent = token[:-4], token[-4], token[-3:]
+        return float(f"{mantissa}E{sign}{exponent}")
+
+
+class AutoTable(dict):
+    """One table of the AUTO-07p output file ``fort.7``, i.e. a segment of
+    a branch. Maps the column names (``BR``, ``PT``, ``TY``, ``LAB``,
+    ``PAR(1)``, ``L2-NORM``, ``U(1)``, ...) to NumPy arrays.
+    """
+
+    int_columns = ("BR", "PT", "TY", "LAB")
+
+    @property
+    def n_rows(self):
+        for column in self.values():
+            return len(column)
+        return 0
+
+    @property
+    def columns(self):
+        return list(self.keys())
+
+    def to_dataframe(self):
+        """Returns the table as a ``pandas.DataFrame``. Requires pandas."""
+        from pandas import DataFrame
+
+        return DataFrame(dict(self))
+
+
+def labeled_points(tables):
+    """Returns a list with one dictionary per labeled point in ``tables``,
+    holding the ``label``, the point ``type``, the ``branch`` and the
+    position (``table``, ``row``) of the point."""
+    points = []
+    for table_number, table in enumerate(tables):
+        for row in np.flatnonzero(table["LAB"]):
+            points.append(
+                {
+                    "label": int(table["LAB"][row]),
+                    "type": point_type_code(table["TY"][row]),
+                    "branch": int(table["BR"][row]),
+                    "table": table_number,
+                    "row": int(row),
+                }
+            )
+    return points
+
+
+class PointIndex:
+    """Index over the labeled points of the tables of a solution.
+
+    Points are looked up by label, point type and branch in constant time.
+    On construction, the branches emanating from branch points are
+    determined: a table whose first row coincides with a branch point
+    (BP) of another branch starts at that point. AUTO-07p writes both
+    directions of a switched branch as separate tables with the same
+    branch number.
+
+    Parameters
+    ----------
+    tables : list of :class:`pyfurc.util.AutoTable`
+        The tables of the solution.
+    points : list of dict, optional
+        The labeled points of ``tables`` as returned by
+        :func:`pyfurc.util.labeled_points`. Computed if not given.
+
+    Variables
+    ---------
+    :ivar dict branch_graph: Maps every branch number to the list of
+        ``(label, branch)`` tuples of the branch points on it and the
+        branches emanating from them.
+    :ivar dict origins: Maps the numbers of branches starting at a branch
+        point to the label of that point.
+    """
+
+    def __init__(self, tables, points=None):
+        if points is None:
+            points = labeled_points(tables)
+        self._by_label = {}
+        self._by_type = {}
+        self._by_branch = {}
+        for point in points:
+            self._by_label[point["label"]] = point
+            name = point_type_name(point["type"])
+            self._by_type.setdefault(name, []).append(point)
+            self._by_branch.setdefault(point["branch"], []).append(point)
+        self.branch_graph = {
+            int(table["BR"][0]): [] for table in tables if table.n_rows
+        }
+        self.origins = {}
+        for table in tables:
+            if not table.n_rows:
+                continue
+            branch = int(table["BR"][0])
+            origin = self._origin(tables, table, branch)
+            if origin is not None and branch not in self.origins:
+                self.origins[branch] = origin["label"]
+                self.branch_graph[origin["branch"]].append((origin["label"], branch))
+
+    def _origin(self, tables, table, branch):
+        """Returns the branch point of another branch that coincides with
+        the first row of ``table`` or ``None``."""
+        for point in self._by_type.get("BP", []):
+            if point["branch"] == branch:
+                continue
+            bp_table = tables[point["table"]]
+            columns = [
+                column
+                for column in table
+                if column.startswith(("PAR(", "U(")) and column in bp_table
+            ]
+            if columns and all(
+                np.isclose(table[column][0], bp_table[column][point["row"]], atol=1e-9)
+                for column in columns
+            ):
+                return point
+        return None
+
+    def point(self, label):
+        """Returns the labeled point with label ``label``.
+
+        Raises
+        ------
+        KeyError
+            If there is no point with this label.
+        """
+        try:
+            return self._by_label[label]
+        except KeyError:
+            raise KeyError(f"The solution has no point with label {label}.")
+
+    def points(self, type=None, branch=None):
+        """Returns the labeled points, optionally only those of point type
+        ``type`` (a name like ``"BP"`` or a code, see
+        :data:`pyfurc.util.POINT_TYPES`) on branch ``branch``."""
+        if type is None and branch is None:
+            return list(self._by_label.values())
+        if type is None:
+            return list(self._by_branch.get(branch, []))
+        if not isinstance(type, str):
+            type = point_type_name(type)
+        points = self._by_type.get(type, [])
+        if branch is not None:
+            points = [point for point in points if point["branch"] == branch]
+        return list(points)
+
+
+class Fort7Parser:
+    """Incremental parser for lines of the AUTO-07p output file ``fort.7``.
+
+    Lines are fed one at a time, so a file is parsed in a single pass.
+    Rows are collected in preallocated blocks of ``chunk_rows`` rows,
+    which bounds the memory needed on top of the resulting arrays.
+
+    Parameters
+    ----------
+    chunk_rows : int, optional
+        Number of rows per block, by default 4096.
+    """
+
+    def __init__(self, chunk_rows=4096):
+        self.chunk_rows = chunk_rows
+        self.tables = []
+        self.columns = None
+        self._blocks = []
+        self._block = None
+        self._n_block_rows = 0
+
+    def feed(self, line):
+        """Parses one line of ``fort.7``.
+
+        Returns
+        -------
+        numpy.ndarray or None
+            The values of the row if ``line`` is a data row, else ``None``.
+        """
+        tokens = line.split()
+        if not tokens:
+            return None
+        if tokens[0] == "0":
+            # header or comment line, a data row never has branch number 0
+            self.finish_table()
+            if len(tokens) > 1 and tokens[1] == "PT":
+                self.columns = ["BR"] + tokens[1:]
+            return None
+        if self.columns is None:
+            # data row without preceding header, nothing to assign it to
+            return None
+        if len(tokens) != len(self.columns):
+            # incomplete line, e.g. of a run that has been killed
+            return None
+        if self._block is None:
+            self._block = np.empty((self.chunk_rows, len(self.columns)))
+            self._n_block_rows = 0
+        row = self._block[self._n_block_rows]
+        row[:] = [_fortran_float(token) for token in tokens]
+        self._n_block_rows += 1
+        if self._n_block_rows == self.chunk_rows:
+            self._blocks.append(self._block)
+            self._block = None
+        return row
+
+    def finish_table(self):
+        """Finalizes the table currently being parsed, if any."""
+        if self._block is not None:
+            self._blocks.append(self._block[: self._n_block_rows])
+            self._block = None
+        if not self._blocks:
+            return
+        data = (
+            np.concatenate(self._blocks) if len(self._blocks) > 1 else self._blocks[0]
+        )
+        self._blocks = []
+        table = AutoTable()
+        for i, column in enumerate(self.columns):
+            if column in AutoTable.int_columns:
+                table[column] = data[:, i].astype(np.int64)
+            else:
+                table[column] = data[:, i].copy()
+        self.tables.append(table)
+
+    def point(self, row):
+        """Returns the row ``row`` of a table being parsed, as returned by
+        :meth:`feed`, as :class:`pyfurc.util.ContinuationPoint`."""
+        values = dict(zip(self.columns, row))
+        return ContinuationPoint(
+            branch=int(values["BR"]),
+            point=int(values["PT"]),
+            type=point_type_name(values["TY"]),
+            label=int(values["LAB"]),
+            par=values["PAR(1)"],
+            l2norm=values.get("L2-NORM"),
+            u=np.array([values[col] for col in self.columns if col.startswith("U(")]),
+        )
+
+
+class Fort8Reader:
+    """Lazy reader for the AUTO-07p solution and restart file ``fort.8``.
+
+    On first access, an index mapping each solution label to the byte
+    offsets of its record is built by skipping over the data lines. Single
+    records are then decoded on demand from a memory map of the file, so
+    only the requested solutions are ever parsed.
+
+    Parameters
+    ----------
+    fname : str
+        Path of the ``fort.8`` file.
+    """
+
+    header_fields = (
+        "IBR",
+        "NTOT",
+        "ITP",
+        "LAB",
+        "NFPR",
+        "ISW",
+        "NTPL",
+        "NAR",
+        "NROWPR",
+        "NTST",
+        "NCOL",
+        "NPAR",
+    )
+
+    def __init__(self, fname):
+        self.fname = fname
+        self._file = None
+        self._mmap = None
+        self._index = None
+
+    def __getstate__(self):
+        # memory maps can not be pickled, they are reopened on demand
+        data = self._mmap if isinstance(self._mmap, bytes) else None
+        return {"fname": self.fname, "_file": None, "_mmap": data, "_index": None}
+
+    def copy_to(self, fname):
+        """Writes the contents of the file to ``fname``, e.g. as AUTO-07p
+        restart file ``fort.3``."""
+        if isinstance(self._mmap, bytes):
+            with open(fname, "wb") as outfile:
+                outfile.write(self._mmap)
+        else:
+            shutil.copyfile(self.fname, fname)
+
+    def load(self):
+        """Reads the complete file into memory, so that it may be deleted
+        afterwards."""
+        if not isinstance(self._mmap, bytes):
+            self.close()
+            with open(self.fname, "rb") as infile:
+                self._mmap = infile.read()
+
+    def _open(self):
+        if self._mmap is None:
+            self._file = open(self.fname, "rb")
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._mmap = b""
+            else:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+
+    @property
+    def index(self):
+        """Dictionary mapping labels to the record header and the byte
+        offsets of the record data."""
+        if self._index is None:
+            self._index = {}
+            data = self._open()
+            offset = 0
+            while offset < len(data):
+                end = data.find(b"\n", offset)
+                end = len(data) if end < 0 else end + 1
+                header = [int(token) for token in data[offset:end].split()]
+                if not header:
+                    offset = end
+                    continue
+                if len(header) < len(self.header_fields):
+                    # truncated record of a run that has been killed
+                    break
+                start = end
+                for _ in range(header[8]):  # NROWPR
+                    if end >= len(data):
+                        break
+                    end = data.find(b"\n", end)
+                    end = len(data) if end < 0 else end + 1
+                else:
+                    self._index[header[3]] = (
+                        dict(zip(self.header_fields, header)),
+                        start,
+                        end,
+                    )
+                offset = end
+        return self._index
+
+    def labels(self):
+        return list(self.index)
+
+    def record(self, label):
+        """Decodes the record of the solution with label ``label``.
+
+        Returns
+        -------
+        dict
+            The header fields and the arrays ``T`` (mesh points), ``U``
+            (state at each mesh point), ``ICP`` (free parameters),
+            ``RLDOT`` and ``UDOT`` (direction vector) and ``PAR``
+            (parameter values). For algebraic problems ``U`` is the state
+            vector.
+        """
+        header, start, end = self.index[label]
+        tokens = self._open()[start:end].split()
+        ntpl, nar, nfpr = header["NTPL"], header["NAR"], header["NFPR"]
+        pos = ntpl * nar
+        values = np.array([_fortran_float(tok.decode()) for tok in tokens[:pos]])
+        values = values.reshape(ntpl, nar)
+        icp = [int(tok) for tok in tokens[pos : pos + nfpr]]
+        pos += nfpr
+        rest = np.array([_fortran_float(tok.decode()) for tok in tokens[pos:]])
+        rldot = rest[:nfpr]
+        udot = rest[nfpr : nfpr + ntpl * (nar - 1)].reshape(ntpl, nar - 1)
+        par = rest[nfpr + ntpl * (nar - 1) :]
+        rec = dict(header)
+        rec.update(
+            {
+                "T": values[:, 0],
+                "U": values[0, 1:] if ntpl == 1 else values[:, 1:],
+                "ICP": icp,
+                "RLDOT": rldot,
+                "UDOT": udot[0] if ntpl == 1 else udot,
+                "PAR": par,
+            }
+        )
+        return rec
+
+
 class AutoOutputReader:
     def __init__(self, dirc):
         self.dirc = dirc
         self.outfile7 = os.path.join(self.dirc, "fort.7")
 
-    def read_raw_data(self):
-        # TODO Rewrite without pandas (Big chunky bloaty module for reading csv)
-        line_numbers = self.find_table_lines()
-        data = []
-        for lines in line_numbers:
-            start, stop = lines
-            df = read_csv(
-                self.outfile7,
-                header=1,
-                skiprows=start - 1,
-                nrows=stop - start,
-                delim_whitespace=True,
-            )
-            data.append(df)
-        return data
+    def read_raw_data(self, chunk_rows=4096):
+        """Reads all tables of ``fort.7`` in a single pass.
+
+        Returns
+        -------
+        list of :class:`pyfurc.util.AutoTable`
+        """
+        parser = Fort7Parser(chunk_rows=chunk_rows)
+        with open(self.outfile7) as data_file:
+            for line in data_file:
+                parser.feed(line)
+        parser.finish_table()
+        return parser.tables
+
+    def read_raw_dataframes(self):
+        """Reads all tables of ``fort.7`` as ``pandas.DataFrame`` objects.
+        Requires pandas."""
+        return [table.to_dataframe() for table in self.read_raw_data()]
 
     def find_table_lines(self):
         searching_for_start = 1
         line_numbers = []
         with open(self.outfile7) as data_file:
-            for line_number, line in enumerate(data_file.readlines()):
+            for line_number, line in enumerate(data_file):
                 if searching_for_start:
                     if not line.lstrip().startswith("0"):
                         start_line = line_number - 1  # table header starts with 0
@@ -0,0 +1,49 @@
+import os
+
+import pyfurc as pf
+
+
+def _fake_executable(path, size):
+    with open(path, "wb") as outfile:
+        outfile.write(b"\0" * size)
+    return path
+
+
+def test_cache_hit_and_miss(tmp_path):
+    cache = pf.ExecutableCache(cache_dir=str(tmp_path / "cache"))
+    key = cache.key("SUBROUTINE FUNC", ["-O"], str(tmp_path))
+    target = str(tmp_path / "problem.out")
+    assert not cache.fetch(key, target)
+    cache.store(key, _fake_executable(str(tmp_path / "built.out"), 10))
+    assert cache.fetch(key, target)
+    assert os.path.getsize(target) == 10
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    # different flags must not hit
+    assert key != cache.key("SUBROUTINE FUNC", ["-O2"], str(tmp_path))
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = pf.ExecutableCache(cache_dir=str(tmp_path / "cache"), max_size=25)
+    exe = _fake_executable(str(tmp_path / "built.out"), 10)
+    for key in ["a", "b"]:
+        cache.store(key, exe)
+    # use "a" so that "b" becomes the least recently used entry
+    os.utime(os.path.join(cache.cache_dir, "b.out"), (0, 0))
+    assert cache.fetch("a", str(tmp_path / "a.out"))
+    cache.store("c", exe)
+    assert cache.stats()["entries"] == 2
+    assert not cache.fetch("b", str(tmp_path / "b.out"))
+
+
+def test_solving_with_cache(symmetric_bifurcation_problem, tmp_path):
+    cache = pf.ExecutableCache(cache_dir=str(tmp_path / "cache"))
+    bf = symmetric_bifurcation_problem
+    solver = pf.BifurcationProblemSolver(bf, cache=cache)
+    for i in range(2):
+        # the problem name is not part of the cache key
+        bf.problem_name = f"hinged_cantilever_{i:d}"
+        solver.solve()
+        solver.delete_last_solution()
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
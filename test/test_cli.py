@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+import pyfurc as pf
+from pyfurc.cli import main
+from pyfurc.jobs import JobQueue
+from pyfurc.spec import load_spec, problem_from_spec
+
+SPEC = {
+    "name": "spring_bar",
+    "energy": "c/2*phi**2 - P*(1 - cos(phi))",
+    "dofs": ["phi"],
+    "load": "P",
+    "params": {"c": 1.5},
+    "auto_parameters": {"RL1": 2.0},
+}
+
+
+def _write_spec(fname, spec):
+    with open(fname, "w") as outfile:
+        json.dump(spec, outfile)
+    return str(fname)
+
+
+def test_problem_from_spec(tmp_path):
+    bf = problem_from_spec(load_spec(_write_spec(tmp_path / "spec.json", SPEC)))
+    assert bf.problem_name == "spring_bar"
+    assert bf.energy.ndofs == 1
+    assert bf.problem_parameters["RL1"] == 2.0
+    assert [info["value"] for info in bf.energy.params.values()] == [1.5]
+    with pytest.raises(KeyError):
+        problem_from_spec({"energy": "phi**2", "dofs": ["phi"]})
+    with pytest.raises(ValueError):
+        problem_from_spec(dict(SPEC, auto_parameters={"RL3": 2.0}))
+
+
+@pytest.mark.parametrize(
+    "energy",
+    ["__import__('os').system('true')", "phi.__class__", "x*phi", "cos(phi, a=1)"],
+)
+def test_spec_energy_is_not_evaluated(energy):
+    with pytest.raises(ValueError):
+        problem_from_spec(dict(SPEC, energy=energy))
+
+
+def test_load_yaml_spec(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    fname = str(tmp_path / "spec.yaml")
+    with open(fname, "w") as outfile:
+        yaml.safe_dump(SPEC, outfile)
+    assert load_spec(fname) == SPEC
+
+
+def test_job_queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue"))
+    first = queue.submit(SPEC, job_id="a")
+    queue.submit(SPEC, job_id="b")
+    assert queue.status() == {"pending": 2, "running": 0, "done": 0, "failed": 0}
+    assert queue.claim() == (first, SPEC)
+    assert queue.claim()[0] == "b"
+    assert queue.claim() is None
+    assert queue.requeue() == ["a", "b"]
+    assert queue.status()["pending"] == 2
+
+
+def test_cli_solve(tmp_path, capsys):
+    spec = _write_spec(tmp_path / "spec.json", SPEC)
+    output = str(tmp_path / "spring_bar.pfs")
+    assert main(["solve", spec, "-o", output, "--work-dir", str(tmp_path), "-q"]) == 0
+    assert "BP" not in capsys.readouterr().out
+    solution = pf.BifurcationProblemSolution.load(output)
+    assert solution.raw_data[1]["PAR(1)"][0] == pytest.approx(1.5, abs=1e-5)
+
+
+def test_cli_worker(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    good = _write_spec(tmp_path / "good.json", SPEC)
+    bad = _write_spec(tmp_path / "bad.json", dict(SPEC, energy="phi**2 +"))
+    main(["submit", queue_dir, good, bad, "--prefix", "job_"])
+    assert main(["worker", queue_dir, "-j", "2", "--work-dir", str(tmp_path)]) == 1
+
+    queue = JobQueue(queue_dir)
+    assert queue.status() == {"pending": 0, "running": 0, "done": 1, "failed": 1}
+    solution = pf.BifurcationProblemSolution.load(queue.result("job_good"))
+    assert solution.raw_data[1]["PAR(1)"][0] == pytest.approx(1.5, abs=1e-5)
+    assert queue.result("job_bad") is None
+    with open(queue.path("failed", "job_bad", ".log")) as infile:
+        assert "SyntaxError" in infile.read()
+    assert os.path.isfile(queue.path("done", "job_good", ".log"))
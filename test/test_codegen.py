@@ -0,0 +1,151 @@
+import pytest
+import sympy as sp
+
+import pyfurc as pf
+from pyfurc import core
+
+
+def _coupled_problem(**kwargs):
+    a = pf.Dof("a")
+    b = pf.Dof("b")
+    P = pf.Load("P")
+    V = pf.Energy(
+        sp.Rational(1, 2) * (a ** 2 + b ** 2)
+        + sp.sin(a + b) ** 2 * sp.cos(a - b)
+        - P * (2 - sp.cos(a) - sp.cos(b))
+    )
+    return pf.BifurcationProblem(V, name="coupled", **kwargs)
+
+
+def test_cse_declares_temporaries():
+    bf = _coupled_problem(cse=True, analytic_jacobian=True)
+    code = pf.BifurcationProblemSolver(bf)._f_func()
+    assert "DOUBLE PRECISION :: CSE1" in code
+    assert bf.cse_report["ops_after"] < bf.cse_report["ops_before"]
+    # temporaries used only by the Jacobian are computed after the early return
+    f_part, jac_part = code.split("IF (IJAC.EQ.0) RETURN")
+    for temp in range(1, bf.cse_report["temporaries"] + 1):
+        assert (f"CSE{temp:d} =" in f_part) != (f"CSE{temp:d} =" in jac_part)
+
+
+def test_long_sums_are_split():
+    dofs = [pf.Dof(f"x{i:d}") for i in range(60)]
+    P = pf.Load("P")
+    V = pf.Energy(
+        sum(dof ** 2 for dof in dofs) / 2
+        + sum(sp.sin(dof) for dof in dofs) ** 2
+        - P * sum(dof for dof in dofs)
+    )
+    bf = pf.BifurcationProblem(V, name="long_sums")
+    local_vars, (statements,) = bf._fortran_func_body()
+    assert local_vars == [f"SUM{i:d}" for i in range(1, 61)]
+    for statement in statements:
+        assert statement.count("+") + statement.count("-") <= 2 * 50
+    solver = pf.BifurcationProblemSolver(bf)
+    assert "DOUBLE PRECISION :: SUM1," in solver._f_func()
+
+
+def test_helper_subroutines(symmetric_bifurcation_problem):
+    bf = pf.BifurcationProblem(
+        symmetric_bifurcation_problem.energy,
+        name="hinged_cantilever_helpers",
+        params={"RL1": 2.0},
+        analytic_jacobian=True,
+    )
+    solver = pf.BifurcationProblemSolver(bf, retention="delete")
+    solver.max_routine_size = 1
+    code = solver.fortran_source()
+    assert "MODULE PYFURC_FUNC" in code
+    assert "CALL FUNC_F1(NDIM,U,PAR,F)" in code
+    assert "CALL FUNC_DFDU1(NDIM,U,PAR,DFDU)" in code
+    solution = solver.solve()
+    assert abs(solution.raw_data[1]["PAR(1)"][0] - 1.0) < 1e-5
+
+
+def _energy(backend):
+    a = pf.Dof("a")
+    b = pf.Dof("b")
+    P = pf.Load("P")
+    c = pf.Parameter("c", 2.0)
+    return pf.Energy(
+        c / 2 * (a ** 2 + b ** 2)
+        + sp.sin(a + b) ** 2 * sp.cos(a - b)
+        - P * (2 - sp.cos(a) - sp.cos(b)),
+        backend=backend,
+    )
+
+
+def test_symengine_backend():
+    pytest.importorskip("symengine")
+    reference = _energy("sympy")
+    energy = _energy("symengine")
+    assert energy.backend == "symengine"
+    for method in ["hessian", "parameter_derivatives"]:
+        for row, ref_row in zip(
+            getattr(energy, method)(), getattr(reference, method)()
+        ):
+            for entry, ref_entry in zip(row, ref_row):
+                assert sp.simplify(entry - ref_entry) == 0
+    # derivatives are expressed in the quantities, so printing is unchanged
+    assert (
+        energy.equilibrium()[0].free_symbols == reference.equilibrium()[0].free_symbols
+    )
+
+
+def test_symengine_fallback(monkeypatch):
+    monkeypatch.setattr(core, "_import_symengine", lambda: None)
+    with pytest.warns(RuntimeWarning):
+        energy = _energy("symengine")
+    assert energy.backend == "sympy"
+    with pytest.raises(ValueError):
+        _energy("maple")
+
+
+def test_symengine_falls_back_to_sympy():
+    pytest.importorskip("symengine")
+    a = pf.Dof("a")
+    P = pf.Load("P")
+    # SymEngine cannot convert integrals
+    with pytest.warns(RuntimeWarning):
+        energy = pf.Energy(
+            a ** 2
+            - P * sp.Integral(sp.cos(a * sp.Symbol("s")), (sp.Symbol("s"), 0, 1)),
+            backend="symengine",
+        )
+    assert energy.backend == "sympy"
+    # and leaves the derivative of Max unevaluated
+    energy = pf.Energy(a ** 2 - P * sp.Max(a, 0), backend="symengine")
+    assert energy.backend == "symengine"
+    (eq,) = energy.equilibrium()
+    assert not eq.has(sp.Derivative)
+    assert sp.simplify(eq - (2 * a - P * sp.Heaviside(a))) == 0
+
+
+@pytest.mark.parametrize("backend", ["sympy", "symengine"])
+def test_parallel_code_generation(backend):
+    if backend == "symengine":
+        pytest.importorskip("symengine")
+    dofs = [pf.Dof(f"x{i:d}") for i in range(8)]
+    P = pf.Load("P")
+    c = pf.Parameter("c", 1.0)
+    V = pf.Energy(
+        c * sum(dof ** 2 for dof in dofs) / 2
+        + sum(sp.sin(dof) for dof in dofs) ** 2
+        - P * sum(sp.cos(dof) for dof in dofs),
+        backend=backend,
+    )
+    bodies = []
+    for processes in [1, 2]:
+        bf = pf.BifurcationProblem(V, analytic_jacobian=True, processes=processes)
+        bf.max_statement_terms = 3
+        bodies.append(bf._fortran_func_body())
+    assert bodies[0] == bodies[1]
+    assert "SUM10" in bodies[0][0]
+
+
+def test_renumber_worker_temporaries():
+    statements = ["F(1) = SUM#1 + SUM#2*SUM12", "DFDU(1,1) = SUM1 - SUM#1"]
+    assert core._renumber_temporaries(statements, 3) == [
+        "F(1) = SUM4 + SUM5*SUM12",
+        "DFDU(1,1) = SUM1 - SUM4",
+    ]
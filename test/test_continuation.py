@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+import sympy as sp
+
+import pyfurc as pf
+from pyfurc.util import point_type_name
+
+
+def _special_points(solution):
+    return [
+        (point_type_name(pt["type"]), pt["branch"], pt["label"])
+        for pt in solution.labeled_points
+    ]
+
+
+def test_numpy_backend_matches_auto(symmetric_bifurcation_problem, tmp_path):
+    bf = symmetric_bifurcation_problem
+    reference = pf.BifurcationProblemSolver(bf, retention="delete").solve()
+    solver = pf.BifurcationProblemSolver(bf, backend="numpy", stability=True)
+    solution = solver.solve()
+    assert solution.directory is None
+    assert "lambdify" in [rec.name for rec in solution.profile.phases]
+    assert _special_points(solution) == _special_points(reference)
+    # the step sizes differ, so only the branch points coincide
+    np.testing.assert_allclose(solution[2], reference[2], atol=1e-6)
+    for table in solution.raw_data:
+        assert table["PAR(1)"][-1] > 2.0
+    # Critical Point is at P=1.
+    assert abs(solution.raw_data[1]["PAR(1)"][0] - 1.0) < 1e-5
+    assert solution.raw_data[1]["STABLE"][1:].all()
+
+    fname = str(tmp_path / "hinged_cantilever.pfs")
+    solution.save(fname)
+    loaded = pf.BifurcationProblemSolution.load(fname)
+    assert loaded.labels() == [1, 2, 3, 4, 5]
+    assert loaded.labeled_points == solution.labeled_points
+    with pytest.raises(ValueError):
+        solution.continue_from(2)
+
+
+def test_numpy_backend_limit_point():
+    phi = pf.Dof("phi")
+    P = pf.Load("P")
+    e = pf.Parameter("e", value=0.05)
+    V = pf.Energy(
+        sp.Rational(1, 2) * sp.sin(phi) ** 2
+        - P * (1 - sp.cos(phi))
+        - e * P * sp.sin(phi)
+    )
+    bf = pf.BifurcationProblem(
+        V, name="imperfect_bar", params={"RL1": 2.0, "DS": 0.01}, detect_folds=True
+    )
+    solution = pf.BifurcationProblemSolver(bf, backend="numpy").solve()
+    assert [name for name, _, _ in _special_points(solution)] == ["EP", "LP", "EP"]
+    limit_point = solution.raw_data[0]["PAR(1)"][solution.raw_data[0]["TY"] == 2]
+    # maximum of the equilibrium path P = sin(phi) cos(phi) / (sin(phi) + e cos(phi))
+    phis = np.linspace(0.0, 1.5, 200001)
+    loads = np.sin(phis) * np.cos(phis) / (np.sin(phis) + 0.05 * np.cos(phis))
+    assert limit_point[0] == pytest.approx(loads.max(), abs=1e-5)
+    assert solution.raw_data[0].n_rows < 50
+
+
+def test_numpy_backend_errors(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    with pytest.raises(ValueError):
+        pf.BifurcationProblemSolver(bf, backend="matlab")
+    solver = pf.BifurcationProblemSolver(bf, backend="numpy")
+    with pytest.raises(NotImplementedError):
+        next(solver.iter_solve())
+    bf.set_parameter("ICP", [1, 2])
+    with pytest.raises(NotImplementedError):
+        solver.solve()
+
+
+def test_branch_graph():
+    P = pf.Load("P")
+    a = pf.Dof("a")
+    b = pf.Dof("b")
+    V = pf.Energy(
+        sp.Rational(1, 2) * (a ** 2 + 2 * b ** 2)
+        + a ** 2 * b ** 2
+        - P * (2 - sp.cos(a) - sp.cos(b))
+    )
+    bf = pf.BifurcationProblem(V, name="two_bars", params={"RL1": 3.0})
+    solution = pf.BifurcationProblemSolver(bf, backend="numpy").solve()
+    assert [bp["label"] for bp in solution.points(type="BP")] == [2, 3, 7, 9]
+    assert solution.points(type=1, branch=3) == solution.points("BP")[2:]
+    # branch 3 bifurcates from the trivial branch at P=2, branches 4 and 5
+    # from both directions of branch 3
+    assert solution.branch_graph == {
+        1: [(2, 2), (3, 3)],
+        2: [],
+        3: [(7, 4), (9, 5)],
+        4: [],
+        5: [],
+    }
+    assert solution.branch_origin(4) == solution.point(7)
+    assert solution.branch_origin(1) is None
@@ -1,4 +1,18 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import pytest
+import sympy as sp
+
 import pyfurc as pf
+from pyfurc import core
+from pyfurc.tools import _limit_resources
+from pyfurc.util import point_type_name
 
 
 def test_solving_symmetric(symmetric_bifurcation_problem):
@@ -10,3 +24,367 @@ def test_solving_symmetric(symmetric_bifurcation_problem):
     assert abs(bf.solution.raw_data[1]["PAR(1)"][0] - 1.0) < tol
     assert abs(bf.solution.raw_data[2]["PAR(1)"][0] - 1.0) < tol
     solver.delete_last_solution()
+
+
+def test_solving_symmetric_analytic_jacobian(symmetric_bifurcation_problem):
+    bf = pf.BifurcationProblem(
+        symmetric_bifurcation_problem.energy,
+        name="hinged_cantilever_jac",
+        params={"RL1": 2.0},
+        analytic_jacobian=True,
+    )
+    assert bf._other_parameters["JAC"] == 1
+    solver = pf.BifurcationProblemSolver(bf)
+    solver.solve()
+    tol = 1e-5
+    assert abs(bf.solution.raw_data[1]["PAR(1)"][0] - 1.0) < tol
+    assert abs(bf.solution.raw_data[2]["PAR(1)"][0] - 1.0) < tol
+    solver.delete_last_solution()
+
+
+def test_solving_symmetric_symengine(symmetric_bifurcation_problem):
+    pytest.importorskip("symengine")
+    energy = pf.Energy(symmetric_bifurcation_problem.energy.expr, backend="symengine")
+    bf = pf.BifurcationProblem(
+        energy, name="hinged_cantilever_symengine", analytic_jacobian=True
+    )
+    bf.set_parameter("RL1", 2.0)
+    solution = pf.BifurcationProblemSolver(bf, retention="delete").solve()
+    assert abs(solution.raw_data[1]["PAR(1)"][0] - 1.0) < 1e-5
+
+
+def test_solving_symmetric_runtime_start_values(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    solver = pf.BifurcationProblemSolver(bf, runtime_start_values=True)
+    assert "READ(FUNIT,*) PAR(1:1)" in solver._f_stpnt()
+    solver.solve()
+    tol = 1e-5
+    assert abs(bf.solution.raw_data[1]["PAR(1)"][0] - 1.0) < tol
+    assert abs(bf.solution.raw_data[2]["PAR(1)"][0] - 1.0) < tol
+    solver.delete_last_solution()
+
+
+def test_save_and_load_solution(symmetric_bifurcation_problem, tmp_path):
+    bf = symmetric_bifurcation_problem
+    solver = pf.BifurcationProblemSolver(bf)
+    solver.solve()
+    fname = str(tmp_path / "hinged_cantilever.pfs")
+    bf.solution.save(fname)
+    solver.delete_last_solution()
+
+    loaded = pf.BifurcationProblemSolution.load(fname)
+    assert len(loaded.raw_data) == len(bf.solution.raw_data)
+    for table, loaded_table in zip(bf.solution.raw_data, loaded.raw_data):
+        for column, values in table.items():
+            assert (loaded_table[column] == values).all()
+    assert loaded.labels() == [1, 2, 3, 4, 5]
+    assert loaded[4][0] > 1.9
+    assert loaded.labeled_points == bf.solution.labeled_points
+    assert [pt["label"] for pt in loaded.points(type="EP")] == [1, 3, 4, 5]
+    assert loaded.point(2)["type"] == 1
+    assert loaded.branch_graph == {1: [(2, 2)], 2: []}
+    with pytest.raises(KeyError):
+        loaded.point(6)
+    assert loaded.metadata["dofs"]["U(1)"]["name"] == "\\varphi"
+    assert loaded.metadata["auto_parameters"]["RL1"] == 2.0
+
+
+def test_solving_async(symmetric_bifurcation_problem):
+    energy = symmetric_bifurcation_problem.energy
+    problems = [
+        pf.BifurcationProblem(
+            energy, name=f"hinged_cantilever_{i:d}", params={"RL1": 2.0}
+        )
+        for i in range(2)
+    ]
+    solvers = [pf.BifurcationProblemSolver(bf) for bf in problems]
+    output = []
+
+    async def solve_all():
+        semaphore = asyncio.Semaphore(1)
+        return await asyncio.gather(
+            *(
+                solver.solve_async(semaphore, on_output=output.append)
+                for solver in solvers
+            )
+        )
+
+    solutions = asyncio.run(solve_all())
+    tol = 1e-5
+    for solution in solutions:
+        assert abs(solution.raw_data[1]["PAR(1)"][0] - 1.0) < tol
+    assert any("BP" in line for line in output)
+    for solver in solvers:
+        solver.delete_last_solution()
+
+
+def test_iter_solve(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    solver = pf.BifurcationProblemSolver(bf)
+    points = list(solver.iter_solve())
+    assert [p.type for p in points if p.label] == ["EP", "BP", "EP", "EP", "EP"]
+    assert len(points) == sum(table["PT"].size for table in bf.solution.raw_data)
+    bp = next(p for p in points if p.type == "BP")
+    assert abs(bp.par - 1.0) < 1e-5
+    solver.delete_last_solution()
+
+    for point in solver.iter_solve():
+        if point.branch == 2:
+            break
+    assert len(bf.solution.raw_data[0]["PT"]) == 11
+    solver.delete_last_solution()
+
+
+def test_solve_profile(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    finished = []
+    solver = pf.BifurcationProblemSolver(bf, profile_hooks=[finished.append])
+    solution = solver.solve()
+    profile = solution.profile
+    names = [rec.name for rec in profile.phases]
+    assert names == [
+        "differentiate",
+        "print",
+        "write",
+        "compile",
+        "link",
+        "run",
+        "parse",
+    ]
+    assert finished == profile.phases
+    assert all(rec.wall >= 0.0 for rec in profile.phases)
+    assert profile.wall_time("compile") > 0.0
+    assert profile.sizes["source"] > 0
+    assert profile.sizes["fort.8"] > 0
+    assert profile.counters["steps"] == sum(table.n_rows for table in solution.raw_data)
+    assert profile.as_dict()["counters"] == profile.counters
+    solver.delete_last_solution()
+
+
+def test_retention(symmetric_bifurcation_problem, tmp_path):
+    bf = symmetric_bifurcation_problem
+    solver = pf.BifurcationProblemSolver(
+        bf, work_dir=str(tmp_path), retention="results"
+    )
+    solver.solve()
+    assert sorted(os.listdir(solver.solution_dir)) == ["fort.7", "fort.8"]
+
+    solver = pf.BifurcationProblemSolver(bf, work_dir=str(tmp_path), retention="delete")
+    solution = solver.solve()
+    assert not os.path.exists(solver.solution_dir)
+    assert solution.directory is None
+    for point in solution.labeled_points:
+        assert solution[point["label"]].shape == (1,)
+
+    # fort.8 is missing if a run is stopped before writing a labeled point
+    dirc = tmp_path / "stopped"
+    dirc.mkdir()
+    (dirc / "fort.7").write_text("")
+    solution = pf.BifurcationProblemSolution()
+    solution.read_solution(str(dirc))
+    solver._apply_retention(str(dirc), solution)
+    assert not dirc.exists()
+
+
+def test_continue_from_branch_point(symmetric_bifurcation_problem, tmp_path):
+    bf = symmetric_bifurcation_problem
+    bf.set_parameter("MXBF", 0)
+    solver = pf.BifurcationProblemSolver(bf, work_dir=str(tmp_path))
+    solution = solver.solve()
+    assert len(solution.raw_data) == 1
+    bp = next(pt for pt in solution.labeled_points if pt["type"] == 1)
+
+    branch = solution.continue_from(bp["label"], NMX=10)
+    assert branch.parent is solution
+    assert solution.children == [branch]
+    assert branch.metadata["restart"] == {"IRS": bp["label"], "ISW": -1, "NMX": 10}
+    phases = [rec.name for rec in branch.profile.phases]
+    assert "reuse" in phases and "compile" not in phases
+    table = branch.raw_data[0]
+    assert table["PAR(1)"][0] == pytest.approx(1.0, abs=1e-5)
+    assert abs(table["U(1)"][-1]) > 0.1
+
+    # without the parent's directory the executable is rebuilt
+    solver.retention = "delete"
+    solution = solver.solve()
+    branch = solution.continue_from(bp["label"], NMX=10)
+    assert "compile" in [rec.name for rec in branch.profile.phases]
+    assert abs(branch.raw_data[0]["U(1)"][-1]) > 0.1
+
+
+def test_track_critical_points():
+    phi = pf.Dof("phi")
+    P = pf.Load("P")
+    e = pf.Parameter("e", 0.05)
+    # rigid bar with transverse spring: unstable symmetric bifurcation at
+    # P = 1, the imperfection e turns it into a limit point
+    V = pf.Energy(
+        sp.Rational(1, 2) * sp.sin(phi) ** 2
+        - P * (1 - sp.cos(phi))
+        - e * P * sp.sin(phi)
+    )
+    bf = pf.BifurcationProblem(
+        V, name="imperfect_bar", params={"RL1": 2.0, "DS": 0.01}, detect_folds=True
+    )
+    solver = pf.BifurcationProblemSolver(bf, retention="delete")
+    solution = solver.solve()
+    lp = next(pt for pt in solution.labeled_points if pt["type"] == 2)
+    boundary = bf.track_critical_point(solution, lp["label"], e, NMX=50)
+    table = boundary.raw_data[0]
+    assert table["PAR(2)"][0] == pytest.approx(0.05)
+    # the limit load tends to the bifurcation load for vanishing imperfection
+    cusp = np.argmin(np.abs(table["PAR(2)"]))
+    assert table["PAR(2)"][cusp] == pytest.approx(0.0, abs=1e-6)
+    assert table["PAR(1)"][cusp] == pytest.approx(1.0, abs=1e-4)
+
+    with pytest.raises(ValueError):
+        bf.track_critical_point(solution, 1, e)
+
+
+def test_track_branch_point():
+    phi = pf.Dof("phi")
+    P = pf.Load("P")
+    c = pf.Parameter("c", 1.0)
+    V = pf.Energy(sp.Rational(1, 2) * c * phi ** 2 - P * (1 - sp.cos(phi)))
+    bf = pf.BifurcationProblem(V, name="spring_bar", params={"RL1": 2.0, "MXBF": 0})
+    solution = pf.BifurcationProblemSolver(bf, retention="delete").solve()
+    bp = next(pt for pt in solution.labeled_points if pt["type"] == 1)
+    boundary = bf.track_critical_point(solution, bp["label"], c, NMX=10, DS=0.05)
+    table = boundary.raw_data[0]
+    assert table.n_rows > 5
+    np.testing.assert_allclose(table["PAR(1)"], table["PAR(2)"], atol=1e-6)
+    assert point_type_name(table["TY"][-1]) == "EP"
+
+
+def test_classify_stability(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    solver = pf.BifurcationProblemSolver(bf, retention="delete", stability=True)
+    solution = solver.solve()
+    assert "stability" in [rec.name for rec in solution.profile.phases]
+    for table in solution.raw_data:
+        # the Hessian of the hinged cantilever is 1 - P cos(phi)
+        expected = 1 - table["PAR(1)"] * np.cos(table["U(1)"])
+        np.testing.assert_allclose(table["MIN_EIG"], expected, atol=1e-10)
+    trivial, postbuckled = solution.raw_data[0], solution.raw_data[1]
+    np.testing.assert_array_equal(trivial["STABLE"], trivial["PAR(1)"] < 1.0 - 1e-8)
+    # the symmetric bifurcation is stable
+    assert postbuckled["STABLE"][1:].all()
+
+
+def _slow_problem():
+    phi = pf.Dof("phi")
+    P = pf.Load("P")
+    V = pf.Energy(phi ** 2 / 2 - P * (1 - sp.cos(phi)))
+    # tiny steps towards a far away end point keep AUTO-07p busy
+    return pf.BifurcationProblem(
+        V,
+        name="slow_cantilever",
+        params={"RL1": 1e9, "DS": 1e-5, "DSMAX": 1e-5, "NMX": 10 ** 8},
+    )
+
+
+@pytest.mark.parametrize(
+    "limits, status",
+    [({"timeouts": {"run": 1.0}}, "timeout"), ({"cpu_time": 1}, "cpu_limit")],
+)
+def test_run_limits(tmp_path, limits, status):
+    solver = pf.BifurcationProblemSolver(
+        _slow_problem(), work_dir=str(tmp_path), retention="delete", **limits
+    )
+    with pytest.warns(RuntimeWarning, match=status):
+        solution = solver.solve()
+    assert solution.status == status
+    # the points computed until the run was stopped
+    assert solution.raw_data[0].n_rows > 100
+    assert solution.labels()[0] == 1
+
+
+def test_cancel_solve(tmp_path):
+    solver = pf.BifurcationProblemSolver(
+        _slow_problem(), work_dir=str(tmp_path), retention="delete"
+    )
+    timer = threading.Timer(1.0, solver.cancel)
+    timer.start()
+    with pytest.warns(RuntimeWarning):
+        solution = solver.solve()
+    assert solution.status == "cancelled"
+    assert solution.raw_data
+
+
+def test_cancel_before_run(tmp_path):
+    solver = pf.BifurcationProblemSolver(
+        _slow_problem(), work_dir=str(tmp_path), timeouts={"run": 30.0}
+    )
+    # fires while the code is generated or compiled
+    timer = threading.Timer(0.05, solver.cancel)
+    timer.start()
+    with pytest.warns(RuntimeWarning):
+        solution = solver.solve()
+    assert solution.status == "cancelled"
+    assert "run" not in [rec.name for rec in solution.profile.phases]
+    assert not solution.raw_data
+
+
+def test_interrupt_kills_auto(tmp_path, monkeypatch):
+    processes = []
+
+    def interrupted_wait(process, timeout=None):
+        processes.append(process)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(core, "wait_auto_executable", interrupted_wait)
+    solver = pf.BifurcationProblemSolver(_slow_problem(), work_dir=str(tmp_path))
+    with pytest.raises(KeyboardInterrupt):
+        solver.solve()
+    assert processes[0].poll() is not None
+
+
+def test_cancel_solve_async(tmp_path, monkeypatch):
+    processes = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def recording_exec(*args, **kwargs):
+        processes.append(await create_subprocess_exec(*args, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", recording_exec)
+    solver = pf.BifurcationProblemSolver(_slow_problem(), work_dir=str(tmp_path))
+
+    async def cancel_run():
+        task = asyncio.ensure_future(solver.solve_async(on_output=lambda line: None))
+        # compiler, linker and AUTO-07p
+        while len(processes) < 3:
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_run())
+    assert processes[-1].returncode == -signal.SIGKILL
+
+
+def test_memory_limit():
+    # the limit is set while the child waits for input
+    process = subprocess.Popen(
+        [sys.executable, "-c", "input(); bytearray(2 ** 30)"],
+        stdin=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    _limit_resources(process.pid, memory=512 * 2 ** 20)
+    _, err = process.communicate("\n")
+    assert "MemoryError" in err
+
+
+def test_build_timeout(symmetric_bifurcation_problem, tmp_path):
+    with pytest.raises(ValueError):
+        pf.BifurcationProblemSolver(
+            symmetric_bifurcation_problem, timeouts={"parse": 1.0}
+        )
+    solver = pf.BifurcationProblemSolver(
+        symmetric_bifurcation_problem,
+        work_dir=str(tmp_path),
+        timeouts={"compile": 1e-3},
+    )
+    with pytest.raises(TimeoutError):
+        solver.solve()
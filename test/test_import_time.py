@@ -0,0 +1,29 @@
+import json
+import subprocess
+import sys
+
+# generous budget for importing the package itself, which must not load
+# any of the heavy dependencies
+IMPORT_BUDGET = 0.1
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pyfurc
+elapsed = time.perf_counter() - start
+heavy = [mod for mod in ("sympy", "numpy", "pandas") if mod in sys.modules]
+pyfurc.Energy
+printing = "sympy.printing.fortran" in sys.modules
+print(json.dumps({"elapsed": elapsed, "heavy": heavy, "printing": printing}))
+"""
+
+
+def test_import_is_lazy():
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, check=True, text=True
+    ).stdout
+    result = json.loads(out)
+    assert result["heavy"] == []
+    assert result["elapsed"] < IMPORT_BUDGET
+    # the FORTRAN printer is only loaded when code is generated
+    assert not result["printing"]
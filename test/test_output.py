@@ -0,0 +1,97 @@
+import os
+
+import pyfurc as pf
+from pyfurc.util import point_type_name
+
+FORT7 = """\
+   0   EPSL= 1.0000E-07  EPSU = 1.0000E-07  EPSS = 1.0000E-05
+   0   0.0000E+00  2.0000E+00 -1.7976+308  1.7976+308
+   0
+   0    PT  TY  LAB    PAR(1)             L2-NORM              U(1)
+   1     1   9    1  0.0000000000E+000  0.0000000000E+000  0.0000000000E+000
+   1     6   1    2  1.0000001000E+000  0.0000000000E+000  0.0000000000E+000
+   1    11   9    3  2.0000002000E+000  0.0000000000E+000  0.0000000000E+000
+   0
+   0    PT  TY  LAB    PAR(1)             L2-NORM              U(1)
+   2     1   0    0  1.0000001000E+000  0.0000000000E+000  0.0000000000E+000
+   2     2   0    0  1.0016686135E+000  1.0000001000E-001 -1.0000001000-100
+"""
+
+
+def test_read_fort7(tmp_path):
+    (tmp_path / "fort.7").write_text(FORT7)
+    # tiny blocks to exercise the block concatenation
+    tables = pf.AutoOutputReader(str(tmp_path)).read_raw_data(chunk_rows=2)
+    assert len(tables) == 2
+    assert tables[0].columns == ["BR", "PT", "TY", "LAB", "PAR(1)", "L2-NORM", "U(1)"]
+    assert list(tables[0]["TY"]) == [9, 1, 9]
+    assert tables[0]["PAR(1)"][1] == 1.0000001
+    assert tables[1].n_rows == 2
+    assert tables[1]["U(1)"][1] == -1.0000001e-100
+
+
+def test_fort7_rows_before_header_are_skipped():
+    parser = pf.Fort7Parser()
+    assert parser.feed(FORT7.splitlines()[4]) is None
+    for line in FORT7.splitlines():
+        parser.feed(line)
+    parser.finish_table()
+    assert [table.n_rows for table in parser.tables] == [3, 2]
+
+
+FORT8 = """\
+     1     6     1     2     1     1       1     2       5    1    0    1    0    1    0    0
+      0.0000000000E+000  0.0000000000E+000
+    1
+      1.0000000000E+000
+      0.0000000000E+000
+      1.0000001000E+000
+     2    24     9     4     1     1       1     2       5    1    0    1    0    1    0    0
+      0.0000000000E+000  1.9175942769E+000
+    1
+      8.6445549386E-001
+      5.0270935852E-001
+      2.0389833761E+000
+"""
+
+
+def test_read_fort8(tmp_path):
+    (tmp_path / "fort.8").write_text(FORT8)
+    reader = pf.Fort8Reader(str(tmp_path / "fort.8"))
+    assert reader.labels() == [2, 4]
+    record = reader.record(4)
+    assert record["IBR"] == 2
+    assert record["ITP"] == 9
+    assert list(record["U"]) == [1.9175942769]
+    assert list(record["PAR"]) == [2.0389833761]
+    assert list(record["UDOT"]) == [5.0270935852e-1]
+    reader.close()
+
+
+def test_read_truncated_fort8(tmp_path):
+    # fort.8 of a run killed while writing the second record
+    (tmp_path / "fort.8").write_text(FORT8[: FORT8.index("    1\n      8.6")])
+    reader = pf.Fort8Reader(str(tmp_path / "fort.8"))
+    assert reader.labels() == [2]
+    reader.close()
+
+
+def test_point_type_names():
+    assert point_type_name(1) == "BP"
+    assert point_type_name(19) == "EP"
+    assert point_type_name(-4) == "UZ"
+    assert point_type_name(-21) == "BT"
+    assert point_type_name(-32) == "GH"
+
+
+def test_data_dir_names_are_unique(tmp_path, monkeypatch):
+    dirs = [pf.DataDir(base_dir=str(tmp_path / "work"), name="p") for _ in range(20)]
+    for ddir in dirs:
+        ddir.create_dir()
+    assert len({str(ddir) for ddir in dirs}) == 20
+    assert all(os.path.isdir(str(ddir)) for ddir in dirs)
+
+    monkeypatch.setenv("PYFURC_WORK_DIR", str(tmp_path / "shm"))
+    ddir = pf.DataDir(name="p")
+    ddir.create_dir()
+    assert os.path.dirname(str(ddir)) == str(tmp_path / "shm")
@@ -0,0 +1,97 @@
+import json
+import pickle
+import subprocess
+import sys
+
+import pytest
+import sympy as sp
+
+import pyfurc as pf
+
+UNPICKLE_SCRIPT = """
+import pickle
+import sys
+
+bf = pickle.loads(sys.stdin.buffer.read())
+print(bf.fingerprint())
+for dicti in [bf.energy.dofs, bf.energy.load, bf.energy.params]:
+    for qty, info in dicti.items():
+        print(type(qty).__name__, qty.name, qty._name, info["name"], info["value"])
+"""
+
+
+def _chain_problem():
+    phis = [pf.Dof(f"\\varphi_{i}", value=0.1 * i) for i in [10, 2, 1]]
+    P = pf.Load("P")
+    c = pf.Parameter("c", value=0.5)
+    V = pf.Energy(sum(c * phi ** 2 - P * sp.cos(phi) for phi in phis))
+    bf = pf.BifurcationProblem(
+        V, name="chain", params={"RL1": 3.0}, detect_folds=True, cse=True
+    )
+    bf.set_quantity_value(c, 0.75)
+    return bf
+
+
+def _description(bf):
+    lines = [bf.fingerprint()]
+    for dicti in [bf.energy.dofs, bf.energy.load, bf.energy.params]:
+        for qty, info in dicti.items():
+            lines.append(
+                f"{type(qty).__name__} {qty.name} {qty._name} "
+                f"{info['name']} {info['value']}"
+            )
+    return lines
+
+
+def test_pickle_to_other_process():
+    bf = _chain_problem()
+    out = subprocess.run(
+        [sys.executable, "-c", UNPICKLE_SCRIPT],
+        input=pickle.dumps(bf),
+        capture_output=True,
+        check=True,
+    )
+    assert out.stdout.decode().splitlines() == _description(bf)
+
+
+def test_pickle_solved_problem(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    pf.BifurcationProblemSolver(bf, backend="numpy", stability=True).solve()
+    restored = pickle.loads(pickle.dumps(bf))
+    assert not restored._solved
+    assert not hasattr(restored, "solution")
+    assert restored.dofs is restored.energy.dofs
+    assert restored.fingerprint() == bf.fingerprint()
+
+
+def test_dict_round_trip():
+    bf = _chain_problem()
+    data = json.loads(json.dumps(bf.to_dict()))
+    restored = pf.BifurcationProblem.from_dict(data)
+    assert _description(restored) == _description(bf)
+    assert restored.cse
+    assert pf.BifurcationProblem.from_json(bf.to_json()).fingerprint() == (
+        bf.fingerprint()
+    )
+
+    qty = next(iter(bf.energy.params))
+    assert pf.PhysicalQuantity.from_dict(qty.to_dict()) == qty
+
+    data["energy"]["quantities"][0]["fortran_name"] = "U(2)"
+    with pytest.raises(ValueError):
+        pf.BifurcationProblem.from_dict(data)
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "__import__('os').system('true')",
+        "cos(\"__import__('os').system('true')\")",
+        "Symbol('U(1)').__class__",
+    ],
+)
+def test_from_dict_does_not_evaluate_code(expr):
+    data = _chain_problem().to_dict()
+    data["energy"]["expr"] = expr
+    with pytest.raises(ValueError):
+        pf.BifurcationProblem.from_dict(data)
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+
+import pyfurc as pf
+
+FINGERPRINT_SCRIPT = """
+import sympy as sp
+import pyfurc as pf
+
+phis = [pf.Dof(f"phi_{i}") for i in [10, 2, 1]]
+P = pf.Load("P")
+c = pf.Parameter("c", 0.5)
+V = pf.Energy(sum(c * phi ** 2 - P * sp.cos(phi) for phi in phis))
+bf = pf.BifurcationProblem(V, name="chain")
+print(bf.fingerprint())
+print(" ".join(info["name"] for info in V.dofs.values()))
+"""
+
+
+def _run_script(hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    out = subprocess.run(
+        [sys.executable, "-c", FINGERPRINT_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return out.stdout.splitlines()
+
+
+def test_fingerprint_is_stable_across_sessions():
+    first = _run_script(1)
+    second = _run_script(2)
+    assert first == second
+    assert len(first[0]) == 64
+
+
+def test_fingerprint(symmetric_bifurcation_problem):
+    bf = symmetric_bifurcation_problem
+    fingerprint = bf.fingerprint()
+    renamed = pf.BifurcationProblem(bf.energy, name="other_name", params={"RL1": 2.0})
+    assert renamed.fingerprint() == fingerprint
+    bf.set_parameter("RL1", 3.0)
+    assert bf.fingerprint() != fingerprint
+
+
+def test_natural_quantity_order():
+    phis = [pf.Dof(f"phi_{i}") for i in [10, 2, 1]]
+    V = pf.Energy(sum(phi ** 2 for phi in phis) - pf.Load("P") * phis[0])
+    names = {qty.name: info["name"] for qty, info in V.dofs.items()}
+    assert names == {"phi_1": "U(1)", "phi_2": "U(2)", "phi_10": "U(3)"}
+
+
+def test_store_hit(symmetric_bifurcation_problem, tmp_path):
+    bf = symmetric_bifurcation_problem
+    store = pf.SolutionStore(store_dir=str(tmp_path / "store"))
+    solver = pf.BifurcationProblemSolver(
+        bf, store=store, work_dir=str(tmp_path), retention="delete"
+    )
+    first = solver.solve()
+    assert store.stats()["entries"] == 1
+    assert store.misses == 1
+
+    second = solver.solve()
+    assert store.hits == 1
+    assert [rec.name for rec in second.profile.phases] == ["store"]
+    assert bf.solution is second
+    assert second.labels() == first.labels()
+    assert (second.raw_data[1]["PAR(1)"] == first.raw_data[1]["PAR(1)"]).all()
+
+    # stability is classified for stored solutions without it
+    solver = pf.BifurcationProblemSolver(bf, store=store, stability=True)
+    third = solver.solve()
+    assert store.hits == 2
+    assert [rec.name for rec in third.profile.phases] == ["store", "stability"]
+    assert all("STABLE" in table for table in third.raw_data)
+
+    # solutions of other backends are not reused
+    solver = pf.BifurcationProblemSolver(bf, store=store, backend="numpy")
+    solver.solve()
+    assert store.misses == 2
+    assert store.stats()["entries"] == 2
+
+    store.clear()
+    assert store.stats()["entries"] == 0
@@ -0,0 +1,28 @@
+import sympy as sp
+
+import pyfurc as pf
+
+
+def test_sweep(tmp_path):
+    phi = pf.Dof("\\varphi")
+    P = pf.Load("P")
+    c = pf.Parameter("c", value=1.0)
+    V = pf.Energy(c / 2 * phi ** 2 - P * (1 - sp.cos(phi)))
+    bf = pf.BifurcationProblem(V, name="hinged_cantilever_sweep")
+    bf.set_parameter("RL1", 4.0)
+
+    sweep = pf.BifurcationSweep(
+        bf, {c: [1.0, 2.0], "DS": [0.1, 0.05]}, processes=2, base_dir=str(tmp_path)
+    )
+    result = sweep.run()
+    assert len(result) == 4
+    # all values are read at runtime, so a single executable serves all runs
+    assert result.executables == 1
+    assert result.failed() == []
+    tol = 1e-5
+    for point, solution in result:
+        # critical load equals the spring stiffness
+        assert abs(solution.raw_data[1]["PAR(1)"][0] - point[c]) < tol
+    # values are restored after the sweep
+    assert V.params[c]["value"] == 1.0
+    assert bf.problem_parameters["DS"] == 0.1